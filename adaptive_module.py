@@ -0,0 +1,156 @@
+"""Module for picking the cheapest result finder for the given lists."""
+import itertools
+import math
+import operator
+from binary_module import binary_result_finder
+from dual_module import dual_result_finder
+from hash_module import hash_result_finder
+from linear_module import linear_result_finder
+
+LINEAR = 'linear'
+BINARY = 'binary'
+DUAL = 'dual'
+HASH = 'hash'
+# cost model key for checking that a list is sorted
+CHECK = 'check'
+
+FINDERS = {
+    LINEAR: linear_result_finder,
+    BINARY: binary_result_finder,
+    DUAL: dual_result_finder,
+    HASH: hash_result_finder,
+}
+
+# Seconds per basic step of each finder, see estimate_costs for what a step
+# is for each one. Made with: python benchmarks.py calibrate
+COST_MODEL = {
+    LINEAR: 4.57e-07,
+    BINARY: 4.12e-07,
+    DUAL: 6.02e-07,
+    HASH: 4.68e-06,
+    CHECK: 7.64e-08,
+}
+
+# how many evenly spread neighbouring pairs sample_sortedness looks at
+SORT_SAMPLES = 32
+
+# the sortedness values, see estimate_costs
+SORTEDNESS = ('strict', 'sorted', None, CHECK)
+
+
+def estimate_costs(tested_size, quarantined_size, tested_sorted,
+                   quarantined_sorted, cost_model=COST_MODEL):
+    """ Returns a dict with the estimated run time of each finder that
+    can be used on lists of the given sizes and sortedness.
+    tested_sorted and quarantined_sorted are 'strict' if the list is in
+    ascending order with no duplicates, 'sorted' if it is only in
+    non-descending order, None if it isn't sorted or CHECK if it might be
+    sorted but that hasn't been checked yet. A finder that needs a CHECK
+    list to be sorted has the cost of checking the whole list added on.
+    The steps counted for each finder are:
+        linear - one per (quarantined, tested) pair, ie, a full scan
+                 per name as most quarantined names aren't found
+        binary - one per halving plus the final check for each name
+        dual   - one per name in either list
+        hash   - one per tested name stored plus one per lookup
+        check  - one per name in a list that is checked
+    """
+    tested_check = (cost_model[CHECK] * tested_size
+                    if tested_sorted == CHECK else 0)
+    quarantined_check = (cost_model[CHECK] * quarantined_size
+                         if quarantined_sorted == CHECK else 0)
+    costs = {}
+    costs[LINEAR] = cost_model[LINEAR] * quarantined_size * tested_size
+    if tested_sorted is not None:
+        steps_per_search = math.log2(tested_size) + 1 if tested_size else 0
+        costs[BINARY] = (cost_model[BINARY] * quarantined_size
+                         * steps_per_search + tested_check)
+    if (tested_sorted in ('strict', CHECK)
+            and quarantined_sorted in ('strict', CHECK)):
+        costs[DUAL] = (cost_model[DUAL] * (tested_size + quarantined_size)
+                       + tested_check + quarantined_check)
+    costs[HASH] = cost_model[HASH] * (tested_size + quarantined_size)
+    return costs
+
+
+def sortedness(names, get_name=None):
+    """ Returns 'strict' if the Names are in ascending order with no
+    duplicates, 'sorted' if they are in non-descending order, otherwise None.
+    get_name picks the Name out of each item, eg, operator.itemgetter(1)
+    for tested records.
+    The names are compared as plain strings so these checks aren't counted
+    as Name comparisons - they are part of picking a finder, not of
+    the search.
+    """
+    if get_name is not None:
+        names = map(get_name, names)
+    strings = list(map(operator.attrgetter('_name'), names))
+    following = itertools.islice(strings, 1, None)
+    if all(map(operator.lt, strings, following)):
+        return 'strict'
+    following = itertools.islice(strings, 1, None)
+    if all(map(operator.le, strings, following)):
+        return 'sorted'
+    return None
+
+
+def sample_sortedness(names, get_name=None, samples=SORT_SAMPLES):
+    """ Looks at up to samples evenly spread pairs of neighbouring names
+    and returns None if any pair is out of order, otherwise CHECK as the
+    list might be sorted. This takes the same time for any size of list.
+    """
+    if get_name is None:
+        get_name = _same_item
+    step = max(1, (len(names) - 1) // samples)
+    for index in range(0, len(names) - 1, step):
+        if get_name(names[index])._name > get_name(names[index + 1])._name:
+            return None
+    return CHECK
+
+
+def _same_item(item):
+    return item
+
+
+def choose_strategy(tested, quarantined, cost_model=COST_MODEL,
+                    tested_sorted=CHECK, quarantined_sorted=CHECK):
+    """ Returns the name of the finder with the lowest estimated cost
+    for the given lists.
+    tested_sorted and quarantined_sorted can be given if the caller already
+    knows how the lists are sorted, see estimate_costs. Otherwise a few
+    pairs of each list are sampled, and a whole list is only checked if
+    the cheapest finder needs it sorted. The cost of that check counts
+    towards that finder's estimate.
+    """
+    get_name = operator.itemgetter(1)
+    if tested_sorted == CHECK:
+        tested_sorted = sample_sortedness(tested, get_name)
+    if quarantined_sorted == CHECK:
+        quarantined_sorted = sample_sortedness(quarantined)
+    while True:
+        costs = estimate_costs(len(tested), len(quarantined), tested_sorted,
+                               quarantined_sorted, cost_model)
+        strategy = min(costs, key=costs.get)
+        needs_tested = strategy in (BINARY, DUAL) and tested_sorted == CHECK
+        needs_quarantined = strategy == DUAL and quarantined_sorted == CHECK
+        if not (needs_tested or needs_quarantined):
+            return strategy
+        if needs_tested:
+            tested_sorted = sortedness(tested, get_name)
+        if needs_quarantined:
+            quarantined_sorted = sortedness(quarantined)
+
+
+def adaptive_result_finder(tested, quarantined, cost_model=COST_MODEL,
+                           tested_sorted=CHECK, quarantined_sorted=CHECK):
+    """ Looks at the sizes of the lists and whether they are already sorted,
+    then runs whichever of the linear, binary, dual and hash finders is
+    estimated to be the quickest. Sortedness hints can be given, see
+    choose_strategy.
+    Returns the results list and the number of comparisons from that finder
+    along with the name of the finder used, eg, 'hash'.
+    """
+    strategy = choose_strategy(tested, quarantined, cost_model,
+                               tested_sorted, quarantined_sorted)
+    results, comparisons = FINDERS[strategy](tested, quarantined)
+    return results, comparisons, strategy
@@ -0,0 +1,606 @@
+"""Benchmarks for the result finders and hash tables.
+Run a benchmark from the command line, eg,
+    python benchmarks.py rehash --items 100000
+Use python benchmarks.py --help to see the available benchmarks.
+The full suite is run with
+    python benchmarks.py run --output new.json
+and two runs are compared with
+    python benchmarks.py compare old.json new.json
+"""
+import argparse
+import functools
+import json
+import operator
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import adaptive_module
+import hash_functions
+from binary_module import binary_result_finder
+from classes2 import Name
+from dual_module import dual_result_finder, galloping_result_finder
+from hash_module import HashTable, hash_result_finder
+from linear_module import linear_result_finder
+from stats import StatCounter, NAME_COMPS
+
+from tools import make_name_list, make_tested_list, read_test_data
+from tools import convert_test_data, read_binary_test_data
+from tools import generate_test_data, generated_filename
+
+DATA_DIR = './test_data/'
+# the largest data file for each of the size tiers used in tests.py
+TIERS = {
+    'trivial': 'test_data-10n-10n-1-a.txt',
+    'small': 'test_data-10n-10n-10-a.txt',
+    'medium': 'test_data-50n-50n-10-a.txt',
+    'big': 'test_data-1000n-1000n-10-a.txt',
+    'huge': 'test_data-10000n-10000n-10-a.txt',
+    'ginormous': 'test_data-100000n-10000n-10-a.txt',
+}
+
+SUITE_FINDERS = {
+    'linear': linear_result_finder,
+    'binary': binary_result_finder,
+    'dual': dual_result_finder,
+    'hash': hash_result_finder,
+}
+# linear search is skipped when len(tested) * len(quarantined) is bigger
+# than this as it would take far too long
+MAX_LINEAR_WORK = 10 ** 7
+
+# (tested size, quarantined size) for each of the test_data size ratios
+SIZE_RATIOS = [(10, 10), (50, 10), (1000, 1000), (10000, 10000),
+               (100000, 10000), (10000, 100000)]
+
+
+def make_sorted_lists(tested_size, quarantined_size, intersect_size, seed=0):
+    """ Returns a tested list and a quarantined list, both sorted by name,
+    with intersect_size names in common.
+    """
+    generator = random.Random(seed)
+    total_size = tested_size + quarantined_size - intersect_size
+    strings = [f'name{i:08}' for i in range(total_size)]
+    generator.shuffle(strings)
+    tested_strings = strings[:tested_size]
+    quarantined_strings = (strings[:intersect_size]
+                           + strings[tested_size:total_size])
+    return (make_tested_list(sorted(tested_strings)),
+            make_name_list(sorted(quarantined_strings)))
+
+
+def percentile(sorted_values, fraction):
+    """ Returns the value at the given fraction (0 to 1) of a sorted list """
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def rehash_latency(num_items, initial_size=8, max_load_factor=1.0):
+    """ Times every store_pair into a growing HashTable, once with one-shot
+    rehashing and once with incremental rehashing.
+    Returns a dict mapping the mode to a dict of timings in seconds.
+    """
+    results = {}
+    for mode, incremental in (('one-shot', False), ('incremental', True)):
+        names = make_name_list(f'name{i}' for i in range(num_items))
+        table = HashTable(initial_size, max_load_factor=max_load_factor,
+                          incremental=incremental)
+        timings = []
+        for i, name in enumerate(names):
+            start = time.perf_counter()
+            table.store_pair(name, i)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        results[mode] = {
+            'total': sum(timings),
+            'median': percentile(timings, 0.5),
+            'p99': percentile(timings, 0.99),
+            'p99.9': percentile(timings, 0.999),
+            'max': timings[-1],
+        }
+    return results
+
+
+def run_rehash(args):
+    results = rehash_latency(args.items)
+    print(f'store_pair latency for {args.items} items (microseconds)')
+    print(f'{"mode":12}{"total":>12}{"median":>10}{"p99":>10}'
+          f'{"p99.9":>10}{"max":>12}')
+    for mode, timings in results.items():
+        micro = {key: value * 1e6 for key, value in timings.items()}
+        print(f'{mode:12}{micro["total"]:12.0f}{micro["median"]:10.2f}'
+              f'{micro["p99"]:10.2f}{micro["p99.9"]:10.2f}{micro["max"]:12.0f}')
+
+
+def load_tier(tier):
+    """ Returns the (tested, quarantined, expected_results) triple for a tier,
+    or None if its data file isn't available.
+    """
+    filename = DATA_DIR + TIERS[tier]
+    if not os.path.exists(filename):
+        return None
+    return read_test_data(filename)
+
+
+def build_throughput(make_tested, load_factor=0.5, repeats=3):
+    """ Returns the number of records and a dict of the best records per
+    second for building a HashTable from a tested list with store_pair and
+    with HashTable.from_pairs.
+    make_tested is called for a new tested list before every build, eg,
+    by reading the data file again, so every build hashes Names that
+    haven't cached their hash yet, like a build from freshly read data.
+    """
+    best = {'store_pair': 0, 'from_pairs': 0}
+    for _ in range(repeats):
+        tested = make_tested()
+        start = time.perf_counter()
+        table = HashTable(max(1, int(len(tested) / load_factor)))
+        for nhi, name, result in tested:
+            table.store_pair(name, (nhi, result))
+        elapsed = time.perf_counter() - start
+        best['store_pair'] = max(best['store_pair'], len(tested) / elapsed)
+
+        tested = make_tested()
+        start = time.perf_counter()
+        HashTable.from_pairs(
+            ((name, (nhi, result)) for nhi, name, result in tested),
+            load_factor, size=len(tested))
+        elapsed = time.perf_counter() - start
+        best['from_pairs'] = max(best['from_pairs'], len(tested) / elapsed)
+    return len(tested), best
+
+
+def run_build(args):
+    print('HashTable build throughput (records per second)')
+    print(f'{"data":12}{"records":>10}{"store_pair":>14}{"from_pairs":>14}')
+    datasets = []
+    for tier in args.tiers:
+        filename = DATA_DIR + TIERS[tier]
+        if not os.path.exists(filename):
+            print(f'{tier:12}  skipped, {TIERS[tier]} not found')
+        else:
+            datasets.append((tier, functools.partial(_read_tested, filename)))
+    if args.synthetic:
+        datasets.append(('synthetic', functools.partial(
+            _make_synthetic_tested, args.synthetic)))
+    for label, make_tested in datasets:
+        records, best = build_throughput(make_tested)
+        print(f'{label:12}{records:10}{best["store_pair"]:14.0f}'
+              f'{best["from_pairs"]:14.0f}')
+
+
+def _read_tested(filename):
+    return read_test_data(filename)[0]
+
+
+def _make_synthetic_tested(size):
+    return make_tested_list(f'name{i}' for i in range(size))
+
+
+def best_time(function, *args, repeats=3, setup=None):
+    """ Returns the shortest time in seconds taken by function(*args).
+    If setup is given setup(*args) is called, untimed, before each run.
+    """
+    best = None
+    for _ in range(repeats):
+        if setup is not None:
+            setup(*args)
+        start = time.perf_counter()
+        function(*args)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def run_load(args):
+    print('Test data load time (seconds)')
+    print(f'{"data":12}{"text":>10}{"binary":>10}{"speedup":>10}')
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for tier in args.tiers:
+            text_filename = DATA_DIR + TIERS[tier]
+            if not os.path.exists(text_filename):
+                print(f'{tier:12}  skipped, {TIERS[tier]} not found')
+                continue
+            binary_filename = os.path.join(temp_dir, tier + '.bin')
+            convert_test_data(text_filename, binary_filename)
+            text_time = best_time(read_test_data, text_filename)
+            binary_time = best_time(read_binary_test_data, binary_filename)
+            print(f'{tier:12}{text_time:10.4f}{binary_time:10.4f}'
+                  f'{text_time / binary_time:10.1f}')
+
+
+def run_gallop(args):
+    print('dual_result_finder (merge) vs galloping_result_finder')
+    print(f'{"tested":>8}{"quar":>8}{"merge comps":>13}{"gallop comps":>14}'
+          f'{"merge s":>10}{"gallop s":>10}')
+    for tested_size, quarantined_size in SIZE_RATIOS:
+        tested, quarantined = make_sorted_lists(
+            tested_size, quarantined_size, min(10, tested_size, quarantined_size))
+        row = []
+        for finder in (dual_result_finder, galloping_result_finder):
+            _, comparisons = finder(tested, quarantined)
+            row.append(comparisons)
+        for finder in (dual_result_finder, galloping_result_finder):
+            row.append(best_time(finder, tested, quarantined))
+        print(f'{tested_size:8}{quarantined_size:8}{row[0]:13}{row[1]:14}'
+              f'{row[2]:10.4f}{row[3]:10.4f}')
+
+
+def comparison_cost(num_names=100000, repeats=3):
+    """ Returns the seconds per Name comparison when sorting num_names
+    random Names with counting on and with counting off, see
+    Name.set_counting. The comparison-free sort key time is taken off
+    both so only the comparisons are left.
+    """
+    generator = random.Random(0)
+    names = make_name_list(f'name{number}' for number
+                           in generator.sample(range(num_names * 10),
+                                               num_names))
+    StatCounter.reset_count(NAME_COMPS)
+    sorted(names)
+    comparisons = StatCounter.get_count(NAME_COMPS)
+    baseline = best_time(sorted, [name._name for name in names],
+                         repeats=repeats)
+    costs = {}
+    was_counting = Name.is_counting()
+    try:
+        for counting in (True, False):
+            Name.set_counting(counting)
+            elapsed = best_time(sorted, names, repeats=repeats)
+            costs[counting] = (elapsed - baseline) / comparisons
+    finally:
+        Name.set_counting(was_counting)
+    return costs
+
+
+def run_counting(args):
+    costs = comparison_cost(args.names)
+    print('Cost per Name comparison (nanoseconds)')
+    print(f'{"counting on":>14}{"counting off":>14}{"speedup":>10}')
+    print(f'{costs[True] * 1e9:14.1f}{costs[False] * 1e9:14.1f}'
+          f'{costs[True] / costs[False]:10.1f}')
+
+
+def hash_names(tier, generated_size=100000):
+    """ Returns the tested Names from a tier's data file, or if it isn't
+    available generated_size Names from a generated data file.
+    """
+    data = load_tier(tier)
+    if data is None:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, 'names.txt')
+            generate_test_data(filename, generated_size, 0, 0)
+            data = read_test_data(filename)
+    return [record[1] for record in data[0]]
+
+
+def hash_quality(names, hash_function, repeats=3):
+    """ Returns the names hashed per second by hash_function and some
+    stats for the chains of a HashTable with one slot per name:
+    the fraction of empty slots, the longest chain and the average number
+    of nodes looked at to find a stored name (1.5 for an ideal hash).
+    Names cache their own hash so those caches are cleared before each
+    timed run to time the hash being computed.
+    """
+    elapsed = float('inf')
+    for _ in range(repeats):
+        for name in names:
+            name._hash = None
+        start = time.perf_counter()
+        for name in names:
+            hash_function(name)
+        elapsed = min(elapsed, time.perf_counter() - start)
+    table = HashTable.from_pairs(((name, None) for name in names), 1.0,
+                                 size=len(names), hash_function=hash_function)
+    lengths = table.chain_lengths()
+    # the names in a chain of length n are found after 1, 2 ... n nodes
+    nodes_looked_at = sum(length * (length + 1) // 2 for length in lengths)
+    return {
+        'names_per_second': len(names) / elapsed,
+        'empty_slots': lengths.count(0) / len(lengths),
+        'longest_chain': max(lengths),
+        'average_search': nodes_looked_at / len(names),
+    }
+
+
+def run_hashes(args):
+    names = hash_names(args.tier, args.names)
+    hash_function_choices = dict(hash_functions.HASH_FUNCTIONS)
+    hash_function_choices['seeded'] = hash_functions.SeededHash(
+        random.getrandbits(32))
+    print(f'Hash functions on {len(names)} names, one slot per name')
+    print(f'{"hash":10}{"names/s":>12}{"empty":>8}{"longest":>9}'
+          f'{"avg search":>12}')
+    for label, hash_function in hash_function_choices.items():
+        quality = hash_quality(names, hash_function)
+        print(f'{label:10}{quality["names_per_second"]:12.0f}'
+              f'{quality["empty_slots"]:8.3f}{quality["longest_chain"]:9}'
+              f'{quality["average_search"]:12.3f}')
+
+
+def clear_hash_caches(tested, quarantined):
+    """ Clears the hash cached on every Name in the lists, so the next run
+    computes them all again like a run on freshly read data does.
+    """
+    for record in tested:
+        record[1]._hash = None
+    for name in quarantined:
+        name._hash = None
+
+
+def calibrate_cost_model(tested_size=2000, quarantined_size=200, repeats=3):
+    """ Times each finder on sorted generated lists and returns a cost model
+    for adaptive_module, ie, the seconds per step of each finder.
+    The Names' hash caches are cleared before every run so the hash cost
+    includes computing the hashes, as it does on fresh data.
+    """
+    tested, quarantined = make_sorted_lists(tested_size, quarantined_size, 10)
+    unit_model = dict.fromkeys(adaptive_module.COST_MODEL, 1)
+    steps = adaptive_module.estimate_costs(tested_size, quarantined_size,
+                                           'strict', 'strict', unit_model)
+    cost_model = {}
+    for strategy, finder in adaptive_module.FINDERS.items():
+        elapsed = best_time(finder, tested, quarantined, repeats=repeats,
+                            setup=clear_hash_caches)
+        cost_model[strategy] = elapsed / steps[strategy]
+    elapsed = best_time(adaptive_module.sortedness, tested,
+                        operator.itemgetter(1), repeats=repeats)
+    cost_model[adaptive_module.CHECK] = elapsed / tested_size
+    return cost_model
+
+
+def run_calibrate(args):
+    cost_model = calibrate_cost_model(args.tested, args.quarantined)
+    print('COST_MODEL = {')
+    for strategy, cost in cost_model.items():
+        print(f'    {strategy.upper()}: {cost:.3g},')
+    print('}')
+
+
+def tier_sizes(tier):
+    """ Returns the (tested, quarantined, intersect) sizes in a tier's
+    file name, eg, (1000, 1000, 10) for 'test_data-1000n-1000n-10-a.txt'
+    """
+    bits = TIERS[tier].split('-')
+    return int(bits[1].strip('inr')), int(bits[2].strip('inr')), int(bits[3])
+
+
+def peak_traced_kb(function, *args):
+    """ Calls function(*args) with tracemalloc on and returns the peak
+    memory it allocated in KB, ie, the traced peak minus what was already
+    allocated when it started. Only Python allocations are traced.
+    """
+    tracemalloc.start()
+    try:
+        start = tracemalloc.get_traced_memory()[0]
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return (peak - start) // 1024
+
+
+def measure_finder(finder, tested, quarantined, repeats):
+    """ Runs the finder repeats times and returns a dict of its timings
+    and counters. The Names' hash caches are cleared before every run so
+    each one computes its hashes like a run on freshly read data,
+    hashes_computed is how many that was. peak_traced_kb is the Python
+    memory allocated at the peak of one more run with tracemalloc on,
+    see peak_traced_kb.
+    """
+    timings = []
+    for _ in range(repeats):
+        clear_hash_caches(tested, quarantined)
+        StatCounter.reset_counts()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+        start = time.perf_counter()
+        _, comparisons = finder(tested, quarantined)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    result = {
+        'runs': repeats,
+        'median': percentile(timings, 0.5),
+        'p95': percentile(timings, 0.95),
+        'comparisons': comparisons,
+        'counted_comparisons': StatCounter.get_count(NAME_COMPS),
+        'hashes': Name.get_hashes(),
+        'hashes_computed': Name.get_hashes_computed(),
+        'memory_used': HashTable.get_memory_used(),
+    }
+    # tracemalloc slows everything down so the peak has its own untimed run
+    clear_hash_caches(tested, quarantined)
+    result['peak_traced_kb'] = peak_traced_kb(finder, tested, quarantined)
+    return result
+
+
+def run_suite(tiers, finders, repeats=5, synthetic=False):
+    """ Runs each finder on each tier and returns the results as a dict
+    keyed by 'finder/tier'. With synthetic=True tiers without a data file
+    use generated sorted lists of the same sizes.
+    """
+    results = {}
+    for tier in tiers:
+        data = load_tier(tier)
+        if data is not None:
+            tested, quarantined, _ = data
+        elif synthetic:
+            tested, quarantined = make_sorted_lists(*tier_sizes(tier))
+        else:
+            print(f'{tier}: skipped, {TIERS[tier]} not found', file=sys.stderr)
+            continue
+        for finder_name in finders:
+            if (finder_name == 'linear'
+                    and len(tested) * len(quarantined) > MAX_LINEAR_WORK):
+                print(f'linear/{tier}: skipped, too slow', file=sys.stderr)
+                continue
+            results[f'{finder_name}/{tier}'] = measure_finder(
+                SUITE_FINDERS[finder_name], tested, quarantined, repeats)
+    return results
+
+
+def run_suite_command(args):
+    results = run_suite(args.tiers, args.finders, args.repeats, args.synthetic)
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results,
+    }
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f'{"benchmark":20}{"median s":>10}{"p95 s":>10}{"comparisons":>13}'
+          f'{"hashes":>9}{"computed":>10}{"memory":>9}{"peak KB":>9}')
+    for key, result in results.items():
+        print(f'{key:20}{result["median"]:10.4f}{result["p95"]:10.4f}'
+              f'{result["comparisons"]:13}{result["hashes"]:9}'
+              f'{result["hashes_computed"]:10}{result["memory_used"]:9}'
+              f'{result["peak_traced_kb"]:9}')
+
+
+def compare_results(old, new, threshold=0.1, min_delta=0.005):
+    """ Compares two 'results' dicts made by run_suite and returns a list
+    of (benchmark, what, old value, new value) regressions. A regression is
+    a median time more than threshold (a fraction) and more than min_delta
+    seconds slower, or any increase in comparisons, hashes or memory used.
+    min_delta keeps run to run noise on very quick benchmarks from being
+    flagged.
+    """
+    regressions = []
+    for key in sorted(old.keys() & new.keys()):
+        old_median = old[key]['median']
+        new_median = new[key]['median']
+        if (new_median > old_median * (1 + threshold)
+                and new_median - old_median > min_delta):
+            regressions.append((key, 'median', old_median, new_median))
+        for counter in ('comparisons', 'hashes', 'memory_used'):
+            if new[key][counter] > old[key][counter]:
+                regressions.append((key, counter, old[key][counter],
+                                    new[key][counter]))
+    return regressions
+
+
+def run_compare(args):
+    with open(args.old) as old_file, open(args.new) as new_file:
+        old = json.load(old_file)['results']
+        new = json.load(new_file)['results']
+    regressions = compare_results(old, new, args.threshold, args.min_delta)
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f'{key}: only in {"old" if key in old else "new"} results')
+    for key, what, old_value, new_value in regressions:
+        print(f'REGRESSION {key} {what}: {old_value} -> {new_value}')
+    if not regressions:
+        print('No regressions')
+    return 1 if regressions else 0
+
+
+def run_generate(args):
+    filename = args.output or os.path.join(
+        DATA_DIR, generated_filename(args.tested, args.quarantined,
+                                     args.intersect))
+    first_letters = None
+    if args.letters:
+        first_letters = {}
+        for item in args.letters:
+            letter, _, weight = item.partition('=')
+            first_letters[letter] = float(weight or 1)
+    start = time.perf_counter()
+    generate_test_data(filename, args.tested, args.quarantined,
+                       args.intersect, (args.min_length, args.max_length),
+                       first_letters, args.true_fraction, args.seed)
+    print(f'Wrote {filename} in {time.perf_counter() - start:.1f} seconds')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    rehash = subparsers.add_parser(
+        'rehash', help='tail latency of one-shot vs incremental rehashing')
+    rehash.add_argument('--items', type=int, default=100000)
+    rehash.set_defaults(run=run_rehash)
+
+    build = subparsers.add_parser(
+        'build', help='HashTable build throughput, store_pair vs from_pairs')
+    build.add_argument('--tiers', nargs='*', choices=list(TIERS),
+                       default=['big', 'huge', 'ginormous'])
+    build.add_argument('--synthetic', type=int, default=0,
+                       help='also build from this many generated records')
+    build.set_defaults(run=run_build)
+
+    load = subparsers.add_parser(
+        'load', help='load time of text vs binary test data files')
+    load.add_argument('--tiers', nargs='*', choices=list(TIERS),
+                      default=['big', 'huge', 'ginormous'])
+    load.set_defaults(run=run_load)
+
+    gallop = subparsers.add_parser(
+        'gallop', help='comparisons and time of merge vs galloping dual finder')
+    gallop.set_defaults(run=run_gallop)
+
+    calibrate = subparsers.add_parser(
+        'calibrate', help='print a cost model for adaptive_module')
+    calibrate.add_argument('--tested', type=int, default=2000)
+    calibrate.add_argument('--quarantined', type=int, default=200)
+    calibrate.set_defaults(run=run_calibrate)
+
+    counting = subparsers.add_parser(
+        'counting', help='cost per Name comparison with counting on and off')
+    counting.add_argument('--names', type=int, default=100000)
+    counting.set_defaults(run=run_counting)
+
+    hashes = subparsers.add_parser(
+        'hashes', help='throughput and chain lengths of each hash function')
+    hashes.add_argument('--tier', choices=list(TIERS), default='ginormous')
+    hashes.add_argument('--names', type=int, default=100000,
+                        help='names to generate if the tier file is missing')
+    hashes.set_defaults(run=run_hashes)
+
+    suite = subparsers.add_parser(
+        'run', help='run every finder on every tier and save JSON results')
+    suite.add_argument('--output', default='bench_results.json')
+    suite.add_argument('--tiers', nargs='*', choices=list(TIERS),
+                       default=list(TIERS))
+    suite.add_argument('--finders', nargs='*', choices=list(SUITE_FINDERS),
+                       default=list(SUITE_FINDERS))
+    suite.add_argument('--repeats', type=int, default=5)
+    suite.add_argument('--synthetic', action='store_true',
+                       help='generate lists for tiers with no data file')
+    suite.set_defaults(run=run_suite_command)
+
+    compare = subparsers.add_parser(
+        'compare', help='flag regressions between two saved runs')
+    compare.add_argument('old')
+    compare.add_argument('new')
+    compare.add_argument('--threshold', type=float, default=0.1,
+                         help='allowed fractional slowdown of the median')
+    compare.add_argument('--min-delta', type=float, default=0.005,
+                         help='smallest slowdown of the median in seconds '
+                              'that counts as a regression')
+    compare.set_defaults(run=run_compare)
+
+    generate = subparsers.add_parser(
+        'generate', help='write a generated test data file')
+    generate.add_argument('tested', type=int)
+    generate.add_argument('quarantined', type=int)
+    generate.add_argument('intersect', type=int)
+    generate.add_argument('--output',
+                          help='file to write, default is in ' + DATA_DIR)
+    generate.add_argument('--min-length', type=int, default=8)
+    generate.add_argument('--max-length', type=int, default=12)
+    generate.add_argument('--letters', nargs='*',
+                          help='first letter weights, eg, A=3 B=1 C')
+    generate.add_argument('--true-fraction', type=float, default=0.5)
+    generate.add_argument('--seed', type=int, default=0)
+    generate.set_defaults(run=run_generate)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
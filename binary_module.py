@@ -5,13 +5,32 @@ per while loop, ie, one comparison per halving.
 
 import tools
 # uncomment the next line if you want to make some Name objects
-from classes import Name
+from classes2 import Name
 
 # We recomment using a helper function that does a binary search
 # for a Name in a given tested list. This will let you test your
 # binary search by itself.
-
-
+def binary_search(tested, name):
+    """ Returns the first (nhi, Name, result) record in the sorted tested list
+    with the given name, or None if there isn't one, and the number of
+    comparisons used.
+    Uses one comparison per halving plus one final equality check.
+    """
+    comparisons = 0
+    first = 0
+    last = len(tested) - 1
+    while first < last:
+        midpoint = (first + last) // 2
+        comparisons += 1
+        if name <= tested[midpoint][1]:
+            last = midpoint
+        else:
+            first = midpoint + 1
+    if len(tested) > 0:
+        comparisons += 1
+        if tested[first][1] == name:
+            return tested[first], comparisons
+    return None, comparisons
 
 
 def binary_result_finder(tested, quarantined):
@@ -35,33 +54,173 @@ def binary_result_finder(tested, quarantined):
     total_comparisons = 0
     results = []
     # ---start student section---
-    for names in quarantined:
-        first = 0
-        last = len(tested) - 1
-        while first < last:
-            midpoint = (first + last) // 2
-            nhi, name, result = tested[midpoint]
-            total_comparisons += 1
-            if names <= name:
-                last = midpoint - 1
-            else:
-                first = midpoint + 1
-                
-        midpoint = (first + last) // 2
-        try:
-            if names == name:
-                tuples = (names, nhi, result)
-                results.append(tuples)
-            else:
-                tuples = (names, None, None)
-                results.append(tuples)
-        except IndexError:
-            pass
+    for name in quarantined:
+        record, comparisons = binary_search(tested, name)
+        total_comparisons += comparisons
+        if record is None:
+            results.append((name, None, None))
+        else:
+            nhi, _, result = record
+            results.append((name, nhi, result))
             
     # ===end student section===
     return results, total_comparisons
 
 
+def batched_binary_result_finder(tested, quarantined, presorted=False):
+    """ Does the same job as binary_result_finder but searches for all the
+    quarantined names as one batch.
+    The queries are put in name order (unless presorted is True, meaning
+    quarantined is already sorted) then the middle query is binary searched
+    for and splits the batch in two: the smaller queries only need to search
+    the part of tested up to where it landed and the bigger ones only the
+    part after it, and so on down.
+    The comparisons made while sorting the queries are included in the
+    total. The results are in the same order as quarantined.
+    """
+    counter = _ComparisonCounter()
+    order = list(range(len(quarantined)))
+    if not presorted:
+        order.sort(key=lambda position: _CountedName(quarantined[position],
+                                                     counter))
+    results = [None] * len(quarantined)
+    _search_batch(tested, quarantined, order, 0, len(order),
+                  0, len(tested), results, counter)
+    return results, counter.comparisons
+
+
+class _ComparisonCounter:
+    """ A running total of comparisons shared by the batch searches """
+
+    def __init__(self):
+        self.comparisons = 0
+
+
+class _CountedName:
+    """ Sort key that counts the comparisons sorted() makes """
+    __slots__ = ('name', 'counter')
+
+    def __init__(self, name, counter):
+        self.name = name
+        self.counter = counter
+
+    def __lt__(self, other):
+        self.counter.comparisons += 1
+        return self.name < other.name
+
+
+def _search_batch(tested, quarantined, order, query_low, query_high,
+                  tested_low, tested_high, results, counter):
+    """ Finds the results for the queries order[query_low:query_high],
+    which are in name order and all have their first position not less
+    than them somewhere in tested[tested_low:tested_high + 1].
+    """
+    if query_low >= query_high:
+        return
+    query_middle = (query_low + query_high) // 2
+    position = order[query_middle]
+    name = quarantined[position]
+    first = tested_low
+    last = tested_high
+    while first < last:
+        midpoint = (first + last) // 2
+        counter.comparisons += 1
+        if tested[midpoint][1] < name:
+            first = midpoint + 1
+        else:
+            last = midpoint
+    results[position] = (name, None, None)
+    if first < len(tested):
+        counter.comparisons += 1
+        nhi, tested_name, result = tested[first]
+        if tested_name == name:
+            results[position] = (name, nhi, result)
+    _search_batch(tested, quarantined, order, query_low, query_middle,
+                  tested_low, first, results, counter)
+    _search_batch(tested, quarantined, order, query_middle + 1, query_high,
+                  first, tested_high, results, counter)
+
+
+class EytzingerIndex:
+    """ A search index built once from a tested list sorted by Name.
+    The records are stored in Eytzinger (breadth first) order, ie, the
+    middle record is at position 1, the middles of its two halves are at
+    positions 2 and 3, and so on, so the record to check next is always at
+    2k or 2k + 1. The first few levels that every search goes through sit
+    together at the start of the lists instead of being spread over the
+    whole tested list.
+    find uses one comparison per level plus one final equality check, the
+    same as binary_search, and adds them to self.comparisons_used.
+    """
+
+    def __init__(self, tested):
+        self.comparisons_used = 0
+        size = len(tested)
+        # position 0 isn't used so the children of k are 2k and 2k + 1
+        self._names = [None] * (size + 1)
+        self._records = [None] * (size + 1)
+        # an in order walk of the implicit tree visits the positions in
+        # the same order as the sorted records
+        record_index = 0
+        position = 1
+        stack = []
+        while stack or position <= size:
+            if position <= size:
+                stack.append(position)
+                position = 2 * position
+            else:
+                position = stack.pop()
+                self._records[position] = tested[record_index]
+                self._names[position] = tested[record_index][1]
+                record_index += 1
+                position = 2 * position + 1
+
+    def find(self, name):
+        """ Returns the first (nhi, Name, result) record with the given name
+        or None if there isn't one.
+        """
+        names = self._names
+        size = len(names) - 1
+        comparisons = 0
+        position = 1
+        while position <= size:
+            comparisons += 1
+            position = 2 * position + (names[position] < name)
+        # undo the moves right made after the last move left, that
+        # position is the first name not less than the given name
+        position >>= (~position & (position + 1)).bit_length()
+        if position == 0:
+            self.comparisons_used += comparisons
+            return None
+        self.comparisons_used += comparisons + 1
+        if names[position] == name:
+            return self._records[position]
+        return None
+
+    def __len__(self):
+        return len(self._names) - 1
+
+
+def eytzinger_result_finder(tested, quarantined, index=None):
+    """ Does the same job as binary_result_finder using an EytzingerIndex.
+    Pass in an index already built from tested to reuse it between calls,
+    otherwise one is built. Only comparisons made by this call's lookups are
+    returned.
+    """
+    if index is None:
+        index = EytzingerIndex(tested)
+    start_comparisons = index.comparisons_used
+    results = []
+    for name in quarantined:
+        record = index.find(name)
+        if record is None:
+            results.append((name, None, None))
+        else:
+            nhi, _, result = record
+            results.append((name, nhi, result))
+    return results, index.comparisons_used - start_comparisons
+
+
 # Don't submit your code below or pylint will get annoyed :)
 if __name__ == '__main__':
     # write your own simple tests here
@@ -1,5 +1,6 @@
 """Module containing classes for storing and comparing votes."""
 import doctest
+import weakref
 from stats import StatCounter, NAME_COMPS
 
 NAME_COMP_ERROR = 'Can only compare Names with other Names'
@@ -43,9 +44,25 @@ class Name:
     <Dee>
     """
 
+    # Names are stored in __slots__ rather than a per instance __dict__
+    # as big tested lists have one Name per record, __weakref__ lets the
+    # intern pool hold Names without keeping them alive
+    __slots__ = ('_name', '_hash', '__weakref__')
+
     # class variables
     # whenever a Name is hashed this count will be incremented by the __hash__ method
     _hashes_used = 0
+    # _hashes_used is split into hashes that were actually computed
+    # and hashes that were answered from the value cached on the Name
+    _hashes_computed = 0
+    _hash_cache_hits = 0
+    # str -> Name, used by Name.intern so that duplicate names share one object
+    # a Name drops out of the pool once nothing else refers to it
+    _intern_pool = weakref.WeakValueDictionary()
+    # called with both Names after every comparison, see set_comparison_hook
+    _comparison_hook = None
+    # whether comparisons are counted, see set_counting
+    _counting = True
 
     def __init__(self, base):
         """ Names should only be made out of str objects, ie, base must be a str
@@ -54,50 +71,126 @@ class Name:
         """
         if isinstance(base, str):
             self._name = base
+            # the hash is computed on first use, see __hash__
+            self._hash = None
         else:
             raise TypeError(NAME_CREATE_ERROR)
 
+    @classmethod
+    def intern(cls, base):
+        """ Returns the pooled Name for base, making it if needed.
+        Interned Names with the same base are the same object so
+        comparing them short-circuits on identity (the comparison is
+        still counted).
+        The pool only holds weak references, so once every interned Name
+        for base has been dropped it is freed and the next intern makes a
+        new one.
+        >>> Name.intern('Lee') is Name.intern('Lee')
+        True
+        >>> Name.intern('Lee') is Name('Lee')
+        False
+        """
+        name = cls._intern_pool.get(base)
+        if name is None:
+            name = cls(base)
+            cls._intern_pool[base] = name
+        return name
+
+    @classmethod
+    def set_counting(cls, enabled):
+        """ Turns comparison counting on or off for every Name.
+        With counting off the comparison methods are swapped for versions
+        that never touch StatCounter, so uncounted runs don't pay for
+        counting at all. Counting is on by default.
+        >>> Name.set_counting(False)
+        >>> Name('Dee') < Name('Lee')
+        True
+        >>> Name.is_counting()
+        False
+        >>> Name.set_counting(True)
+        """
+        cls._counting = enabled
+        cls._set_comparisons()
+
+    @classmethod
+    def set_comparison_hook(cls, hook):
+        """ Makes every comparison call hook(self, other) after it has been
+        made (and counted if counting is on), eg, to profile which Names are
+        compared most. Setting the hook to None puts the plain comparisons
+        back. Whether comparisons are counted isn't changed.
+        >>> compared = []
+        >>> Name.set_comparison_hook(lambda a, b: compared.append(a))
+        >>> Name('Dee') < Name('Lee')
+        True
+        >>> compared
+        [Name('Dee')]
+        >>> Name.set_comparison_hook(None)
+        """
+        cls._comparison_hook = hook
+        cls._set_comparisons()
+
+    @classmethod
+    def _set_comparisons(cls):
+        """ Puts the comparison methods for the current counting mode and
+        hook on the class
+        """
+        methods = _COMPARISONS[cls._counting, cls._comparison_hook is not None]
+        for method_name, method in methods.items():
+            setattr(cls, method_name, method)
+
+    @classmethod
+    def is_counting(cls):
+        """ Returns True if comparisons are being counted, see set_counting """
+        return cls._counting
+
+    @classmethod
+    def clear_intern_pool(cls):
+        """ Empties the intern pool. Names already handed out are kept
+        by whoever is holding them.
+        """
+        cls._intern_pool = weakref.WeakValueDictionary()
+
     def __eq__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name == j._name
+            return self is j or self._name == j._name
 
     def __le__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name <= j._name
+            return self is j or self._name <= j._name
 
     def __ne__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name != j._name
+            return self is not j and self._name != j._name
 
     def __lt__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name < j._name
+            return self is not j and self._name < j._name
 
     def __gt__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name > j._name
+            return self is not j and self._name > j._name
 
     def __ge__(self, j):
         if not isinstance(j, Name):
             raise TypeError(NAME_COMP_ERROR)
         else:
             StatCounter.increment(NAME_COMPS)
-            return self._name >= j._name
+            return self is j or self._name >= j._name
 
     def __repr__(self):
         return f'Name({repr(self._name)})'
@@ -110,7 +203,19 @@ class Name:
         return f'<{self._name}>'
 
     def __hash__(self):
+        """ Every call is counted in _hashes_used but the value is only
+        computed the first time, after that it comes from self._hash.
+        """
         Name._hashes_used += 1
+        if self._hash is not None:
+            Name._hash_cache_hits += 1
+            return self._hash
+        Name._hashes_computed += 1
+        self._hash = self._compute_hash()
+        return self._hash
+
+    def _compute_hash(self):
+        """ Returns the hash value for self._name, see __hash__ """
         if self._name is None:
             return 0
         value = ord(self._name[0]) << 7
@@ -134,30 +239,124 @@ class Name:
     def get_hashes(cls):
         return cls._hashes_used
 
+    @classmethod
+    def get_hashes_computed(cls):
+        return cls._hashes_computed
+
+    @classmethod
+    def get_hash_cache_hits(cls):
+        return cls._hash_cache_hits
+
     @classmethod
     def reset_hashes(cls):
         cls._hashes_used = 0
+        cls._hashes_computed = 0
+        cls._hash_cache_hits = 0
+
+
+def _uncounted_eq(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is j or self._name == j._name
+
+
+def _uncounted_le(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is j or self._name <= j._name
+
+
+def _uncounted_ne(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is not j and self._name != j._name
+
+
+def _uncounted_lt(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is not j and self._name < j._name
+
+
+def _uncounted_gt(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is not j and self._name > j._name
+
+
+def _uncounted_ge(self, j):
+    if not isinstance(j, Name):
+        raise TypeError(NAME_COMP_ERROR)
+    return self is j or self._name >= j._name
+
+
+# the counted and uncounted comparison methods, see _COMPARISONS
+_COUNTED_COMPARISONS = {method_name: Name.__dict__[method_name] for method_name
+                        in ('__eq__', '__le__', '__ne__',
+                            '__lt__', '__gt__', '__ge__')}
+_UNCOUNTED_COMPARISONS = {
+    '__eq__': _uncounted_eq,
+    '__le__': _uncounted_le,
+    '__ne__': _uncounted_ne,
+    '__lt__': _uncounted_lt,
+    '__gt__': _uncounted_gt,
+    '__ge__': _uncounted_ge,
+}
+
+
+def _hooked(method):
+    """ Returns a version of the comparison method that calls
+    Name._comparison_hook after comparing
+    """
+    def hooked_method(self, j):
+        result = method(self, j)
+        Name._comparison_hook(self, j)
+        return result
+    return hooked_method
+
+
+# (counting, hooked) -> the comparison methods Name uses
+_COMPARISONS = {
+    (True, False): _COUNTED_COMPARISONS,
+    (False, False): _UNCOUNTED_COMPARISONS,
+    (True, True): {method_name: _hooked(method) for method_name, method
+                   in _COUNTED_COMPARISONS.items()},
+    (False, True): {method_name: _hooked(method) for method_name, method
+                    in _UNCOUNTED_COMPARISONS.items()},
+}
 
 
 class Node:
+    # a hash table has one Node per item so these are slotted too
+    __slots__ = ('key', 'value', 'next_node')
 
-    def __init__(self, key, value):
+    def __init__(self, key, value, next_node=None):
         self.key = key
         self.value = value
-        self.next_node = None
+        self.next_node = next_node
 
     def __repr__(self):
-        """ Returns the str repr of the node and all subsequent nodes """
-        this_node = f'{self.key}:{self.value} -> '
-        following_nodes = repr(self.next_node)
-        return this_node + following_nodes
+        """ Returns the str repr of the node and all subsequent nodes,
+        eg, <Lee>:1 -> <Dee>:2 -> None
+        The chain is walked in a loop so long chains don't hit the
+        recursion limit.
+        """
+        parts = []
+        node = self
+        while node is not None:
+            parts.append(f'{node.key}:{node.value} -> ')
+            node = node.next_node
+        parts.append('None')
+        return ''.join(parts)
 
     def __len__(self):
         """ Returns the length of the list starting from self """
-        if self.next_node:
-            return 1 + len(self.next_node)
-        else:
-            return 1
+        length = 0
+        node = self
+        while node is not None:
+            length += 1
+            node = node.next_node
+        return length
 
 
 if __name__ == '__main__':
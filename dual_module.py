@@ -1,4 +1,5 @@
 """Module for finding test results of quarantined people using dual indices."""
+from operator import itemgetter
 from classes2 import Name
 
 # note you might want to import other things here for testing
@@ -31,27 +32,118 @@ def dual_result_finder(tested, quarantined):
     comparisons = 0
     results = []
     # ---start student section---
-    tested1 = 0
-    quarantined1 = 0
-    
-    while tested1 < len(tested) and quarantined1 < len(quarantined):
-        nhi, name, result = tested1
+    tested_index = 0
+    quarantined_index = 0
+
+    while tested_index < len(tested) and quarantined_index < len(quarantined):
+        nhi, name, result = tested[tested_index]
+        quarantined_name = quarantined[quarantined_index]
         comparisons += 1
-        if tested[name] < quarantined[quarantined1]:
-            tested1 += 1
+        if name < quarantined_name:
+            tested_index += 1
         else:
             comparisons += 1
-            if tested[name] > quarantined[quarantined1]:
-                quarantined1 += 1
+            if name == quarantined_name:
+                results.append((quarantined_name, nhi, result))
+                tested_index += 1
             else:
-                results.append(tested[name])
-                tested1 += 1
-                quarantined1 += 1
+                results.append((quarantined_name, None, None))
+            quarantined_index += 1
+
+    # anything left in quarantined is after the last tested name
+    for quarantined_name in quarantined[quarantined_index:]:
+        results.append((quarantined_name, None, None))
     # ===end student section===
 
     return results, comparisons
 
 
+def galloping_result_finder(tested, quarantined):
+    """Does the same job as dual_result_finder, with the same assumptions
+    about the lists, but instead of stepping through the longer list one
+    name at a time it gallops ahead in it.
+    For each name in the shorter list it checks the next 1, 2, 4, 8, ...
+    names of the longer list until it passes the name, then binary searches
+    that last gap. When one list is much shorter than the other this skips
+    over long runs of the longer list with only a few comparisons.
+    Returns the results list and the number of Name comparisons made.
+    """
+    comparisons = 0
+    results = []
+    tested_name = itemgetter(1)
+
+    if len(tested) >= len(quarantined):
+        # gallop through tested looking for each quarantined name
+        start = 0
+        for quarantined_name in quarantined:
+            index, used = _gallop(tested, start, quarantined_name, tested_name)
+            comparisons += used
+            start = index
+            if index < len(tested):
+                nhi, name, result = tested[index]
+                comparisons += 1
+                if name == quarantined_name:
+                    results.append((quarantined_name, nhi, result))
+                    start = index + 1
+                    continue
+            results.append((quarantined_name, None, None))
+    else:
+        # gallop through quarantined looking for each tested name,
+        # the quarantined names skipped over aren't in tested
+        start = 0
+        for nhi, name, result in tested:
+            index, used = _gallop(quarantined, start, name, _same_name)
+            comparisons += used
+            for quarantined_name in quarantined[start:index]:
+                results.append((quarantined_name, None, None))
+            start = index
+            if index < len(quarantined):
+                comparisons += 1
+                if quarantined[index] == name:
+                    results.append((quarantined[index], nhi, result))
+                    start = index + 1
+        for quarantined_name in quarantined[start:]:
+            results.append((quarantined_name, None, None))
+
+    return results, comparisons
+
+
+def _same_name(name):
+    """ Used by _gallop when the items are already Names """
+    return name
+
+
+def _gallop(items, start, target, get_name):
+    """Returns the index of the first item at or after start whose name
+    isn't less than target (or len(items) if there isn't one) and the
+    number of comparisons used to find it.
+    get_name returns the Name for an item.
+    """
+    comparisons = 0
+    low = start
+    high = start
+    step = 1
+    # probe start, start + 1, start + 3, start + 7, ... until not less
+    while high < len(items):
+        comparisons += 1
+        if get_name(items[high]) < target:
+            low = high + 1
+            high += step
+            step *= 2
+        else:
+            break
+    # the answer is somewhere in items[low:high + 1]
+    high = min(high, len(items))
+    while low < high:
+        middle = (low + high) // 2
+        comparisons += 1
+        if get_name(items[middle]) < target:
+            low = middle + 1
+        else:
+            high = middle
+    return low, comparisons
+
+
 if __name__ == '__main__':
     # put your own simple tests here
     # you don't need to submit this code
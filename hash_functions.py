@@ -0,0 +1,132 @@
+"""Module of hash functions that a HashTable can use instead of hash(key).
+Each one takes a key and returns an int. Names and strs are hashed by
+their text (utf-8 encoded), any other key is hashed by str(key).
+Unlike Name.__hash__ these aren't cached on the Name or counted in
+Name.get_hashes().
+    >>> fnv1a_hash(Name('Lee')) == fnv1a_hash('Lee')
+    True
+    >>> hex(xxhash32(''))
+    '0x2cc5d05'
+    >>> hex(xxhash32('a'))
+    '0x550d7456'
+    >>> SeededHash(1)('Lee') == SeededHash(1)('Lee')
+    True
+"""
+import doctest
+from classes2 import Name
+
+MASK_32 = 0xFFFFFFFF
+
+FNV_OFFSET_BASIS = 2166136261
+FNV_PRIME = 16777619
+
+XXH_PRIME_1 = 2654435761
+XXH_PRIME_2 = 2246822519
+XXH_PRIME_3 = 3266489917
+XXH_PRIME_4 = 668265263
+XXH_PRIME_5 = 374761393
+
+
+def _key_text(key):
+    """ Returns the str that a key is hashed by """
+    if isinstance(key, Name):
+        return key._name
+    if isinstance(key, str):
+        return key
+    return str(key)
+
+
+def name_hash(key):
+    """ The key's own hash, ie, Name.__hash__ for Names. This is what a
+    HashTable uses by default and the only hash a saved table can use.
+    """
+    return hash(key)
+
+
+def builtin_str_hash(key):
+    """ Python's built-in str hash of the key's text. It is fast but
+    changes between runs unless PYTHONHASHSEED is set.
+    """
+    return hash(_key_text(key))
+
+
+def fnv1a_hash(key):
+    """ 32 bit FNV-1a of the key's text """
+    value = FNV_OFFSET_BASIS
+    for byte in _key_text(key).encode('utf-8'):
+        value = ((value ^ byte) * FNV_PRIME) & MASK_32
+    return value
+
+
+def _rotate_left(value, bits):
+    return ((value << bits) | (value >> (32 - bits))) & MASK_32
+
+
+def xxhash32(key, seed=0):
+    """ 32 bit xxHash (XXH32) of the key's text with the given seed """
+    data = _key_text(key).encode('utf-8')
+    length = len(data)
+    index = 0
+    if length >= 16:
+        lanes = [(seed + XXH_PRIME_1 + XXH_PRIME_2) & MASK_32,
+                 (seed + XXH_PRIME_2) & MASK_32,
+                 seed & MASK_32,
+                 (seed - XXH_PRIME_1) & MASK_32]
+        while index <= length - 16:
+            for lane in range(4):
+                word = int.from_bytes(data[index:index + 4], 'little')
+                lanes[lane] = (_rotate_left(
+                    (lanes[lane] + word * XXH_PRIME_2) & MASK_32, 13)
+                    * XXH_PRIME_1) & MASK_32
+                index += 4
+        value = (_rotate_left(lanes[0], 1) + _rotate_left(lanes[1], 7)
+                 + _rotate_left(lanes[2], 12) + _rotate_left(lanes[3], 18))
+    else:
+        value = seed + XXH_PRIME_5
+    value = (value + length) & MASK_32
+    while index <= length - 4:
+        word = int.from_bytes(data[index:index + 4], 'little')
+        value = (_rotate_left((value + word * XXH_PRIME_3) & MASK_32, 17)
+                 * XXH_PRIME_4) & MASK_32
+        index += 4
+    while index < length:
+        value = (_rotate_left((value + data[index] * XXH_PRIME_5) & MASK_32,
+                              11) * XXH_PRIME_1) & MASK_32
+        index += 1
+    value ^= value >> 15
+    value = (value * XXH_PRIME_2) & MASK_32
+    value ^= value >> 13
+    value = (value * XXH_PRIME_3) & MASK_32
+    value ^= value >> 16
+    return value
+
+
+class SeededHash:
+    """ xxhash32 with a fixed seed, eg, SeededHash(1234).
+    Different seeds spread the same keys differently, so a table can be
+    given a seed that an attacker doesn't know. Instances can be pickled,
+    so they work with sharded_hash_result_finder.
+    """
+
+    def __init__(self, seed):
+        self.seed = seed
+
+    def __call__(self, key):
+        return xxhash32(key, self.seed)
+
+    def __repr__(self):
+        return f'SeededHash({self.seed})'
+
+
+# the hash functions by name, eg, for choosing one on the command line
+HASH_FUNCTIONS = {
+    'name': name_hash,
+    'builtin': builtin_str_hash,
+    'fnv1a': fnv1a_hash,
+    'xxhash': xxhash32,
+}
+
+
+if __name__ == '__main__':
+    # won't run when importing this module
+    doctest.testmod()
@@ -3,9 +3,39 @@ Module for looking up test results.
 Students need to complete the get_value method for the HashTable
 and then complete the fraud_detect_hash function
 """
+import mmap
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
 from classes2 import Name, Node
+from hash_functions import name_hash
 from stats import StatCounter, HASH_TABLES_CREATED
 
+TABLE_FULL_ERROR = 'An open addressing table needs at least one empty slot'
+# number of old slots moved into the new slots on each operation
+# while a HashTable is being rehashed incrementally
+REHASH_STEP = 4
+# marks a name get_many hasn't looked up yet, as None is a found value too
+_NOT_LOOKED_UP = object()
+
+# Layout of a saved HashTable, all little-endian:
+#   header: magic, number of slots, number of items, size of the name blob
+#   slot offsets: number_of_slots + 1 uint64s, the records for slot i are
+#       records slot_offsets[i] up to slot_offsets[i + 1], in chain order
+#   name offsets: number_of_items + 1 uint64s into the name blob
+#   nhis: number_of_items int64s
+#   results: number_of_items bytes, see SAVED_RESULTS
+#   name blob: the utf-8 encoded names
+TABLE_FILE_MAGIC = b'HASHTBL1'
+TABLE_FILE_HEADER = struct.Struct('<8sQQQ')
+UINT64 = struct.Struct('<Q')
+UINT64_PAIR = struct.Struct('<QQ')
+INT64 = struct.Struct('<q')
+SAVED_RESULTS = {False: 0, True: 1, None: 2}
+LOADED_RESULTS = (False, True, None)
+SAVE_ERROR = 'Only tables with Name keys and (nhi, result) values can be saved'
+SAVE_HASH_ERROR = 'Only tables using the Name hash can be saved'
+
 # note you might want to import other things below for testing
 # but your submission should only include the import lines above.
 
@@ -21,6 +51,8 @@ class HashTable:
        as long as they are hashable with hash(my_testing_thing)...
        But make sure you test it with Name objects as this will let
        you compare your comparisons_used with the actual comparisons used.
+       A different hash function, eg, one from hash_functions, can be
+       given as hash_function when making the table.
        ************************************************************************
        ************************************************************************
        *** DON'T add/remove/change any methods except the get_value method! ***
@@ -33,14 +65,34 @@ class HashTable:
     # This variable doesn't include memory used for the data in each node.
     _memory_used = 0
 
-    def __init__(self, initial_size):
+    def __init__(self, initial_size, max_load_factor=None,
+                 min_load_factor=None, incremental=False, hash_function=None):
         """ Initialises a hash table with initial_size slots.
             The slots are basically stored as a linked list of Nodes.
             The performance counters are all set to zero.
+            By default the table never resizes. If max_load_factor is given
+            the number of slots is doubled whenever storing a pair takes the
+            load factor above it, and if min_load_factor is given the number
+            of slots is halved whenever removing a key takes the load factor
+            below it.
+            With incremental=False all the nodes are moved to the new slots
+            in one go. With incremental=True the old slots are kept and
+            REHASH_STEP of them are moved on each store, lookup or removal,
+            which spreads the cost of rehashing over many operations.
+            hash_function is used in place of hash(key) to pick the slot
+            for a key, the default is the key's own hash.
         """
         self.comparisons_used = 0
+        self.hash_function = hash if hash_function is None else hash_function
         self.number_of_slots = initial_size
         self._number_of_items = 0
+        self._max_load_factor = max_load_factor
+        self._min_load_factor = min_load_factor
+        self._incremental = incremental
+        # while rehashing incrementally self._old_data holds the previous
+        # slots and every old slot below self._rehash_index has been moved
+        self._old_data = None
+        self._rehash_index = 0
 
         # setup the given number of slots, each containing None
         # Note: self._data[i] will be the head of a linked list
@@ -65,7 +117,9 @@ class HashTable:
         are no duplicate names in the tested list so duplicate (key, value)
         pairs won't occur in the main tests. It's just something to think about.
         """
-        slot_index = hash(key) % self.number_of_slots
+        if self._old_data is not None:
+            self._rehash_some()
+        slot_index = self.hash_function(key) % self.number_of_slots
         head = self._data[slot_index]
         new_node = Node(key, value)
         if head is None:
@@ -75,6 +129,39 @@ class HashTable:
             self._data[slot_index] = new_node
         self._number_of_items += 1
         HashTable._memory_used += 1
+        if (self._max_load_factor is not None
+                and self.load_factor() > self._max_load_factor):
+            self.resize(self.number_of_slots * 2)
+
+    @classmethod
+    def from_pairs(cls, pairs, load_factor=0.5, size=None,
+                   hash_function=None):
+        """ Returns a new table holding the given (key, value) pairs.
+            The table is sized once so that it ends up with a load factor of
+            about load_factor, ie, it has len(pairs) / load_factor slots.
+            If pairs is an iterator of known length then pass it as size to
+            avoid first copying the pairs into a list.
+            The result is the same as calling store_pair for each pair in
+            order, but each key is hashed and linked straight into its slot
+            without the per call overhead.
+            hash_function is passed on to the new table.
+        """
+        if size is None:
+            pairs = list(pairs)
+            size = len(pairs)
+        table = cls(max(1, int(size / load_factor)),
+                    hash_function=hash_function)
+        data = table._data
+        number_of_slots = table.number_of_slots
+        hash_function = table.hash_function
+        number_of_items = 0
+        for key, value in pairs:
+            slot_index = hash_function(key) % number_of_slots
+            data[slot_index] = Node(key, value, data[slot_index])
+            number_of_items += 1
+        table._number_of_items = number_of_items
+        HashTable._memory_used += number_of_items
+        return table
 
     def get_value(self, key):
         """ Returns the first value associated with the key.
@@ -92,9 +179,212 @@ class HashTable:
             See the my_tests function below for some starter tests/examples
         """
         # ---start student section---
-        return self._data[key]
+        if self._old_data is not None:
+            self._rehash_some()
+        key_hash = self.hash_function(key)
+        current = self._data[key_hash % self.number_of_slots]
+        while current is not None:
+            self.comparisons_used += 1
+            if current.key == key:
+                return current.value
+            current = current.next_node
+        if self._old_data is not None:
+            # the key may be in an old slot that hasn't been moved yet
+            old_index = key_hash % len(self._old_data)
+            if old_index >= self._rehash_index:
+                current = self._old_data[old_index]
+                while current is not None:
+                    self.comparisons_used += 1
+                    if current.key == key:
+                        return current.value
+                    current = current.next_node
+        return None
         # ===end student section===
 
+    def get_many(self, keys):
+        """ Returns a list with the value for each key in keys, in the same
+            order as keys, with None for keys that aren't in the table.
+            The keys must be Names. Each different name is only hashed and
+            looked up once, so when a name appears many times in keys (in
+            one Name object or in several) the repeats cost a dict lookup
+            instead of a chain walk.
+            Only the comparisons actually made are added to
+            self.comparisons_used, so with repeated names it goes up by less
+            than looking every key up with get_value would.
+        """
+        if self._old_data is not None:
+            # part way through an incremental rehash keys can be in two places
+            return [self.get_value(key) for key in keys]
+        data = self._data
+        number_of_slots = self.number_of_slots
+        hash_function = self.hash_function
+        # name string -> value found for it
+        looked_up = {}
+        values = []
+        comparisons = 0
+        for key in keys:
+            value = looked_up.get(key._name, _NOT_LOOKED_UP)
+            if value is _NOT_LOOKED_UP:
+                value = None
+                current = data[hash_function(key) % number_of_slots]
+                while current is not None:
+                    comparisons += 1
+                    if current.key == key:
+                        value = current.value
+                        break
+                    current = current.next_node
+                looked_up[key._name] = value
+            values.append(value)
+        self.comparisons_used += comparisons
+        return values
+
+    def remove(self, key):
+        """ Removes the first (ie, newest) pair stored for key and returns
+            its value, or returns None if the key isn't in the table.
+            Comparisons are counted in self.comparisons_used as for get_value.
+        """
+        if self._old_data is not None:
+            self._rehash_some()
+        key_hash = self.hash_function(key)
+        value = self._remove_from(self._data, key_hash % self.number_of_slots, key)
+        if value is None and self._old_data is not None:
+            old_index = key_hash % len(self._old_data)
+            if old_index >= self._rehash_index:
+                value = self._remove_from(self._old_data, old_index, key)
+        if value is not None and (self._min_load_factor is not None
+                                  and self.number_of_slots > 1
+                                  and self.load_factor() < self._min_load_factor):
+            self.resize(self.number_of_slots // 2)
+        return value
+
+    def _remove_from(self, slots, slot_index, key):
+        """ Unlinks the first node for key in slots[slot_index] and returns
+            its value, returns None if there isn't one.
+        """
+        previous = None
+        current = slots[slot_index]
+        while current is not None:
+            self.comparisons_used += 1
+            if current.key == key:
+                if previous is None:
+                    slots[slot_index] = current.next_node
+                else:
+                    previous.next_node = current.next_node
+                self._number_of_items -= 1
+                HashTable._memory_used -= 1
+                return current.value
+            previous = current
+            current = current.next_node
+        return None
+
+    def resize(self, new_size):
+        """ Rehashes the table into new_size slots.
+            The existing nodes are reused, so only the slot pointers change.
+            If the table was made with incremental=True the nodes are moved
+            a few slots at a time by later operations, otherwise they are
+            all moved now.
+        """
+        if self._old_data is not None:
+            self.finish_rehash()
+        old_data = self._data
+        self._data = [None] * new_size
+        self.number_of_slots = new_size
+        HashTable._memory_used += new_size
+        self._old_data = old_data
+        self._rehash_index = 0
+        if not self._incremental:
+            self.finish_rehash()
+
+    def finish_rehash(self):
+        """ Moves any old slots that haven't been rehashed yet """
+        if self._old_data is not None:
+            self._rehash_some(len(self._old_data))
+
+    def _rehash_some(self, step=REHASH_STEP):
+        """ Moves up to step old slots into the current slots """
+        old_data = self._old_data
+        end = min(self._rehash_index + step, len(old_data))
+        for old_index in range(self._rehash_index, end):
+            self._move_chain(old_data[old_index])
+            old_data[old_index] = None
+        self._rehash_index = end
+        if end == len(old_data):
+            HashTable._memory_used -= len(old_data)
+            self._old_data = None
+            self._rehash_index = 0
+
+    def _move_chain(self, node):
+        """ Moves a chain of nodes from an old slot into self._data.
+            Any nodes already in a new slot were stored after everything in
+            the old slots, so moved nodes go after them and keep their order.
+            This keeps the newest pair for a key first in its chain.
+        """
+        tails = {}
+        while node is not None:
+            next_node = node.next_node
+            node.next_node = None
+            slot_index = self.hash_function(node.key) % self.number_of_slots
+            tail = tails.get(slot_index)
+            if tail is None:
+                tail = self._data[slot_index]
+                if tail is None:
+                    self._data[slot_index] = node
+                else:
+                    while tail.next_node is not None:
+                        tail = tail.next_node
+                    tail.next_node = node
+            else:
+                tail.next_node = node
+            tails[slot_index] = node
+            node = next_node
+
+    def save(self, filename):
+        """ Saves the table to filename so it can be loaded back with
+            MappedHashTable(filename). The keys must be Names (their hash
+            is the same in every process) and the values must be
+            (nhi, result) pairs, with an int nhi and a result of True,
+            False or None. Each chain is saved in order so lookups in the
+            loaded table make the same comparisons as lookups in this one.
+            The table must use the keys' own hash, which is what
+            MappedHashTable looks keys up with.
+        """
+        if self.hash_function not in (hash, name_hash):
+            raise TypeError(SAVE_HASH_ERROR)
+        self.finish_rehash()
+        slot_offsets = [0]
+        encoded_names = []
+        nhis = []
+        results = []
+        for head_node in self._data:
+            current = head_node
+            while current is not None:
+                if not isinstance(current.key, Name):
+                    raise TypeError(SAVE_ERROR)
+                try:
+                    nhi, result = current.value
+                    results.append(SAVED_RESULTS[result])
+                except (TypeError, ValueError, KeyError):
+                    raise TypeError(SAVE_ERROR)
+                if not isinstance(nhi, int):
+                    raise TypeError(SAVE_ERROR)
+                nhis.append(nhi)
+                encoded_names.append(current.key._name.encode('utf-8'))
+                current = current.next_node
+            slot_offsets.append(len(nhis))
+        name_offsets = [0]
+        for encoded_name in encoded_names:
+            name_offsets.append(name_offsets[-1] + len(encoded_name))
+        number_of_items = len(nhis)
+        with open(filename, 'wb') as table_file:
+            table_file.write(TABLE_FILE_HEADER.pack(
+                TABLE_FILE_MAGIC, self.number_of_slots, number_of_items,
+                name_offsets[-1]))
+            table_file.write(struct.pack(f'<{len(slot_offsets)}Q', *slot_offsets))
+            table_file.write(struct.pack(f'<{len(name_offsets)}Q', *name_offsets))
+            table_file.write(struct.pack(f'<{number_of_items}q', *nhis))
+            table_file.write(bytes(results))
+            table_file.write(b''.join(encoded_names))
+
     def __repr__(self):
         """ This is rather ugly, you are better to do a print(my_hashtable)
         which will use the __str__ method to give more readable output.
@@ -102,13 +392,28 @@ class HashTable:
         return repr(self._data)
 
     def __str__(self):
-        string_thing = 'HashTable:\n'
+        return '\n'.join(self.iter_lines())
+
+    def iter_lines(self):
+        """ Yields the lines of str(self) one at a time (without newlines)
+        so big tables can be dumped without building one huge string.
+        """
+        self.finish_rehash()
+        yield 'HashTable:'
         for slot_index, head_node in enumerate(self._data):
-            string_thing += f'{slot_index:6}: {repr(head_node)}\n'
-        string_thing += (f'Num of items = {self._number_of_items}\n')
-        string_thing += (f'Num of slots = {self.number_of_slots}\n')
-        string_thing += (f'Load factor  = {self.load_factor():.2f}')
-        return string_thing
+            yield f'{slot_index:6}: {repr(head_node)}'
+        yield from self._summary_lines()
+
+    def _summary_lines(self):
+        yield f'Num of items = {self._number_of_items}'
+        yield f'Num of slots = {self.number_of_slots}'
+        yield f'Load factor  = {self.load_factor():.2f}'
+
+    def dump(self, file):
+        """ Writes str(self) to the open text file a line at a time """
+        for line in self.iter_lines():
+            file.write(line)
+            file.write('\n')
 
     def __len__(self):
         return len(self._data)
@@ -126,6 +431,20 @@ class HashTable:
         """ Returns the load factor for the hash table """
         return self._number_of_items / self.number_of_slots
 
+    def chain_lengths(self):
+        """ Returns a list with the number of nodes in each slot's chain.
+        Any rehash in progress is finished first.
+        """
+        self.finish_rehash()
+        lengths = []
+        for node in self._data:
+            length = 0
+            while node is not None:
+                length += 1
+                node = node.next_node
+            lengths.append(length)
+        return lengths
+
     def index(self, start=None):
         """ Points out that we can't do this! """
         raise TypeError(f"{type(self)} doesn't allow using index")
@@ -151,7 +470,253 @@ class HashTable:
 # ----------------- End of HashTable class ----------------------------
 
 
-def hash_result_finder(tested, quarantined, load_factor=0.5):
+class OpenAddressHashTable(HashTable):
+    """An open addressing hash table with linear probing.
+       It has the same interface as HashTable but instead of a linked
+       list in each slot the keys and values are kept in flat parallel
+       lists, along with the hash of each key.
+       A lookup probes forward from hash(key) % number_of_slots until
+       it finds the key or an empty slot. Keys are only compared when
+       their stored hash matches, so most probes don't use a Name
+       comparison.
+       The table needs at least one empty slot so the number of items
+       must stay below the number of slots.
+    """
+
+    def __init__(self, initial_size, hash_function=None):
+        """ Initialises a table with initial_size empty slots.
+            Each slot uses a hash pointer, a key pointer and a value pointer.
+            There are no nodes so storing items uses no extra pointers.
+            hash_function is used in place of hash(key), see HashTable.
+        """
+        self.comparisons_used = 0
+        self.hash_function = hash if hash_function is None else hash_function
+        self.number_of_slots = initial_size
+        self._number_of_items = 0
+        # None in self._hashes marks an empty slot
+        self._hashes = [None] * initial_size
+        self._keys = [None] * initial_size
+        self._values = [None] * initial_size
+        HashTable._memory_used += 3 * initial_size
+        StatCounter.increment(HASH_TABLES_CREATED)
+
+    def store_pair(self, key, value):
+        """ Stores the key, value pair in the first free slot at or after
+            hash(key) % number_of_slots.
+            Unlike HashTable a duplicate key has its value replaced in
+            place. Any Name comparisons made while looking for a duplicate
+            are added to self.comparisons_used.
+            Raises a ValueError if the table has no room left.
+        """
+        key_hash = self.hash_function(key)
+        hashes = self._hashes
+        keys = self._keys
+        slot_index = key_hash % self.number_of_slots
+        while hashes[slot_index] is not None:
+            if hashes[slot_index] == key_hash:
+                self.comparisons_used += 1
+                if keys[slot_index] == key:
+                    self._values[slot_index] = value
+                    return
+            slot_index = (slot_index + 1) % self.number_of_slots
+        if self._number_of_items + 1 >= self.number_of_slots:
+            raise ValueError(TABLE_FULL_ERROR)
+        hashes[slot_index] = key_hash
+        keys[slot_index] = key
+        self._values[slot_index] = value
+        self._number_of_items += 1
+
+    def get_many(self, keys):
+        """ Returns a list with the value for each key in keys, in the same
+            order as keys. Open addressing has no chains to share so this
+            just looks up each key in turn.
+        """
+        return [self.get_value(key) for key in keys]
+
+    def remove(self, key):
+        """ Points out that we can't do this! """
+        raise TypeError(f"{type(self)} doesn't allow removing keys")
+
+    def resize(self, new_size):
+        """ Points out that we can't do this! """
+        raise TypeError(f"{type(self)} doesn't allow resizing")
+
+    def finish_rehash(self):
+        """ Open addressing tables are never part way through a rehash """
+
+    def save(self, filename):
+        """ Points out that we can't do this! """
+        raise TypeError(f"{type(self)} doesn't allow saving")
+
+    @classmethod
+    def from_pairs(cls, pairs, load_factor=0.5, size=None,
+                   hash_function=None):
+        """ Returns a new table holding the given (key, value) pairs,
+            see HashTable.from_pairs. load_factor must be below 1.
+        """
+        if size is None:
+            pairs = list(pairs)
+            size = len(pairs)
+        table = cls(max(1, int(size / load_factor)),
+                    hash_function=hash_function)
+        store_pair = table.store_pair
+        for key, value in pairs:
+            store_pair(key, value)
+        return table
+
+    def get_value(self, key):
+        """ Returns the value associated with the key or None if the key
+            isn't in the table. Only keys with a matching hash are compared
+            and each of those comparisons is added to self.comparisons_used.
+        """
+        key_hash = self.hash_function(key)
+        hashes = self._hashes
+        keys = self._keys
+        slot_index = key_hash % self.number_of_slots
+        while hashes[slot_index] is not None:
+            if hashes[slot_index] == key_hash:
+                self.comparisons_used += 1
+                if keys[slot_index] == key:
+                    return self._values[slot_index]
+            slot_index = (slot_index + 1) % self.number_of_slots
+        return None
+
+    def chain_lengths(self):
+        """ Returns a list with, for each slot, the number of slots probed
+        to reach the key stored there (0 for empty slots), ie, how long
+        the chain to that key is.
+        """
+        lengths = []
+        for slot_index, key_hash in enumerate(self._hashes):
+            if key_hash is None:
+                lengths.append(0)
+            else:
+                home_index = key_hash % self.number_of_slots
+                lengths.append((slot_index - home_index)
+                               % self.number_of_slots + 1)
+        return lengths
+
+    def __repr__(self):
+        return repr(list(zip(self._keys, self._values)))
+
+    def iter_lines(self):
+        yield 'OpenAddressHashTable:'
+        for slot_index, key in enumerate(self._keys):
+            if self._hashes[slot_index] is None:
+                yield f'{slot_index:6}: None'
+            else:
+                value = self._values[slot_index]
+                yield f'{slot_index:6}: {key}:{value}'
+        yield from self._summary_lines()
+
+    def __len__(self):
+        return self.number_of_slots
+
+
+
+class MappedHashTable:
+    """A read only hash table memory-mapped from a file saved with
+       HashTable.save. Opening it only reads the header, the Names and
+       values are decoded from the mapped file as lookups reach them, so
+       loading takes about the same time whatever the size of the table.
+       Lookups give the same values and comparisons_used as the table that
+       was saved. Call close() (or use a with statement) when finished.
+    """
+
+    def __init__(self, filename):
+        self.comparisons_used = 0
+        # record index -> Name, filled in as records are first compared
+        self._names = {}
+        self._map = None
+        self._file = open(filename, 'rb')
+        try:
+            self._open_map(filename)
+        except BaseException:
+            self.close()
+            raise
+
+    def _open_map(self, filename):
+        """ Maps the open file and reads the header, raising ValueError if
+            the file isn't a whole saved HashTable
+        """
+        file_error = f'{filename} is not a saved HashTable or is truncated'
+        file_size = os.fstat(self._file.fileno()).st_size
+        if file_size < TABLE_FILE_HEADER.size:
+            raise ValueError(file_error)
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, number_of_slots, number_of_items, blob_size = (
+            TABLE_FILE_HEADER.unpack_from(self._map, 0))
+        if magic != TABLE_FILE_MAGIC or number_of_slots == 0:
+            raise ValueError(file_error)
+        self.number_of_slots = number_of_slots
+        self._number_of_items = number_of_items
+        self._slot_offsets_start = TABLE_FILE_HEADER.size
+        self._name_offsets_start = (self._slot_offsets_start
+                                    + UINT64.size * (number_of_slots + 1))
+        self._nhis_start = (self._name_offsets_start
+                            + UINT64.size * (number_of_items + 1))
+        self._results_start = self._nhis_start + INT64.size * number_of_items
+        self._names_start = self._results_start + number_of_items
+        if self._names_start + blob_size != file_size:
+            raise ValueError(file_error)
+
+    def _get_name(self, record):
+        """ Returns the Name for the given record, decoding it if needed """
+        name = self._names.get(record)
+        if name is None:
+            start, end = UINT64_PAIR.unpack_from(
+                self._map, self._name_offsets_start + UINT64.size * record)
+            offset = self._names_start
+            name = Name(self._map[offset + start:offset + end].decode('utf-8'))
+            self._names[record] = name
+        return name
+
+    def _get_record_value(self, record):
+        """ Returns the (nhi, result) value for the given record """
+        nhi, = INT64.unpack_from(self._map, self._nhis_start + INT64.size * record)
+        result = LOADED_RESULTS[self._map[self._results_start + record]]
+        return nhi, result
+
+    def get_value(self, key):
+        """ Returns the first value associated with the key or None if the key
+            isn't in the table. Comparisons are counted as in HashTable.
+        """
+        slot_index = hash(key) % self.number_of_slots
+        start, end = UINT64_PAIR.unpack_from(
+            self._map, self._slot_offsets_start + UINT64.size * slot_index)
+        for record in range(start, end):
+            self.comparisons_used += 1
+            if self._get_name(record) == key:
+                return self._get_record_value(record)
+        return None
+
+    def get_many(self, keys):
+        """ Returns a list with the value for each key in keys """
+        return [self.get_value(key) for key in keys]
+
+    def load_factor(self):
+        """ Returns the load factor for the hash table """
+        return self._number_of_items / self.number_of_slots
+
+    def close(self):
+        """ Unmaps and closes the file, the table can't be used after this """
+        self._names = {}
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.number_of_slots
+
+
+def hash_result_finder(tested, quarantined, load_factor=0.5,
+                       table_class=HashTable, hash_function=None):
     """The tested list contains (nhi, Name, result) tuples
        and isn't guaranteed to be in any order
        quarantined is a list of Name objects
@@ -169,24 +734,35 @@ def hash_result_finder(tested, quarantined, load_factor=0.5):
        tested list will result in a load factor of approximately load_factor,
        with the default load_factor set to 0.5.
        That is, the table size is set to be len(tested) // load_factor
+       table_class picks the engine, either HashTable (chaining) or
+       OpenAddressHashTable. Open addressing needs a load_factor below 1.
+       hash_function picks the slots in place of hash(name), the default.
        **** NOTE: Remember to complete the HashTable definition above!
     """
     if len(tested) > 0:
-        table_size = int(len(tested) / load_factor)
-        hash_table = HashTable(table_size)
+        # the table is sized to len(tested) / load_factor slots
+        hash_table = table_class.from_pairs(
+            ((name, (nhi, result)) for nhi, name, result in tested),
+            load_factor, size=len(tested), hash_function=hash_function)
     # think about how to generate results list if tested is empty
     #    Hint: you don't want to generate a hash table with size 0...
     results = []
     # ---start student section---
-    for names in quarantined:
-        hash_table.add(names)
-        
-    i = 0
-    for tests in tested:
-        nhi, name, result = tests
-        if hash_table.contains(name):
-            results.append(name)
-    
+    if len(tested) == 0:
+        results = [(name, None, None) for name in quarantined]
+        return results, 0
+
+    # a get_value loop is quicker than get_many unless quarantined has
+    # many repeated names
+    get_value = hash_table.get_value
+    for name in quarantined:
+        value = get_value(name)
+        if value is None:
+            results.append((name, None, None))
+        else:
+            nhi, result = value
+            results.append((name, nhi, result))
+
     comparisons = hash_table.comparisons_used
     # ===end student section===
     # hint: you can get comparisons from the hash_table if one was used.
@@ -194,6 +770,94 @@ def hash_result_finder(tested, quarantined, load_factor=0.5):
 
 
 
+def iter_hash_results(sections, load_factor=0.5, hash_function=None):
+    """ Streaming version of hash_result_finder.
+    sections is an iterator of (size, records) pairs as made by
+    tools.iter_test_data, ie, the tested records then the quarantined
+    Names. The table is built straight from the tested records, then a
+    (Name, nhi, result) tuple is yielded as each quarantined Name is read,
+    so neither list is ever held in memory.
+    The number of comparisons is returned when the generator finishes,
+    eg, comparisons = yield from iter_hash_results(sections)
+    """
+    tested_size, tested = next(sections)
+    hash_table = None
+    if tested_size > 0:
+        hash_table = HashTable.from_pairs(
+            ((name, (nhi, result)) for nhi, name, result in tested),
+            load_factor, size=tested_size, hash_function=hash_function)
+    quarantined_size, quarantined = next(sections)
+    for name in quarantined:
+        value = None if hash_table is None else hash_table.get_value(name)
+        if value is None:
+            yield (name, None, None)
+        else:
+            nhi, result = value
+            yield (name, nhi, result)
+    return 0 if hash_table is None else hash_table.comparisons_used
+
+
+def _shard_result_finder(job):
+    """ Runs hash_result_finder for one shard in a worker process.
+    job is a (tested_shard, positions, names, load_factor, hash_function)
+    tuple and the positions are handed back so the results can be put in
+    order.
+    """
+    tested_shard, positions, names, load_factor, hash_function = job
+    results, comparisons = hash_result_finder(tested_shard, names, load_factor,
+                                              hash_function=hash_function)
+    return positions, results, comparisons
+
+
+def sharded_hash_result_finder(tested, quarantined, load_factor=0.5,
+                               num_shards=None, hash_function=None):
+    """ Does the same job as hash_result_finder but splits the tested list
+    into num_shards shards by the hash of each Name, and each shard is built
+    and searched by its own worker process. num_shards defaults to the
+    number of CPUs. hash_function is used by the shards' tables and must
+    be picklable, eg, a hash_functions function or SeededHash.
+    The results come back in the same order as the quarantined list and
+    the comparisons are the total used by all the shards' hash tables.
+    The shards are picked with the built-in str hash of each name rather
+    than the Name hash, so every Name is hashed by a worker, not by this
+    process. Every tested record and quarantined Name is pickled and sent
+    to a worker, which costs time and memory on big lists.
+    Note: Name comparisons, hashes and HashTable memory counted inside the
+    worker processes don't show up in this process's counters.
+    """
+    if num_shards is None:
+        num_shards = os.cpu_count() or 1
+    if num_shards <= 1:
+        return hash_result_finder(tested, quarantined, load_factor,
+                                  hash_function=hash_function)
+
+    # the str hash is cached on the str and is unrelated to the Name hash
+    # so the names in a shard still spread over all the slots of its table
+    tested_shards = [[] for _ in range(num_shards)]
+    for record in tested:
+        tested_shards[hash(record[1]._name) % num_shards].append(record)
+    shard_positions = [[] for _ in range(num_shards)]
+    shard_names = [[] for _ in range(num_shards)]
+    for position, name in enumerate(quarantined):
+        shard = hash(name._name) % num_shards
+        shard_positions[shard].append(position)
+        shard_names[shard].append(name)
+
+    jobs = [(tested_shards[shard], shard_positions[shard],
+             shard_names[shard], load_factor, hash_function)
+            for shard in range(num_shards) if shard_names[shard]]
+    results = [None] * len(quarantined)
+    comparisons = 0
+    if jobs:
+        with ProcessPoolExecutor(max_workers=len(jobs)) as executor:
+            for positions, shard_results, shard_comparisons in executor.map(
+                    _shard_result_finder, jobs):
+                for position, (_, nhi, result) in zip(positions, shard_results):
+                    results[position] = (quarantined[position], nhi, result)
+                comparisons += shard_comparisons
+    return results, comparisons
+
+
 def my_tests():
     """ put your own simple tests here.
     You don't need to submit this code
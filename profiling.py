@@ -0,0 +1,190 @@
+"""Module for measuring the comparisons, hashes and memory used by a block
+of code, eg,
+
+    with measure() as build:
+        table = HashTable.from_pairs(pairs)
+    with measure() as lookups:
+        values = table.get_many(keys)
+    print(build.memory_used, lookups.comparisons)
+
+Measurements work by taking a snapshot of the counters on the way in and
+another on the way out, so they nest and overlap freely and the counters
+never need resetting.
+
+For more detail a Profiler records how many comparisons each lookup made,
+which Names were compared most and how long a HashTable's chains are.
+"""
+import collections
+import json
+import random
+import time
+from classes2 import Name
+from hash_module import HashTable
+from stats import StatCounter, NAME_COMPS, HASH_TABLES_CREATED
+
+
+class Measurement:
+    """ The counts for the code run inside a with block, see measure.
+    Comparisons and hash tables created are only those made by the thread
+    that entered the block. Hashes and memory are shared by every thread.
+    memory_used is the change in HashTable memory, so it is negative if
+    the block freed more than it used.
+    """
+
+    FIELDS = ('comparisons', 'hashes', 'hashes_computed',
+              'hash_tables_created', 'memory_used', 'elapsed')
+
+    def __init__(self, label=None):
+        self.label = label
+        self._start = None
+        for field in self.FIELDS:
+            setattr(self, field, None)
+
+    @staticmethod
+    def _snapshot():
+        return (StatCounter.get_local_count(NAME_COMPS),
+                Name.get_hashes(),
+                Name.get_hashes_computed(),
+                StatCounter.get_local_count(HASH_TABLES_CREATED),
+                HashTable.get_memory_used(),
+                time.perf_counter())
+
+    def __enter__(self):
+        self._start = self._snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = self._snapshot()
+        for field, start_value, end_value in zip(self.FIELDS, self._start,
+                                                 end):
+            setattr(self, field, end_value - start_value)
+        return False
+
+    def as_dict(self):
+        """ Returns the label and counts as a dict, eg, for saving as JSON """
+        result = {'label': self.label}
+        for field in self.FIELDS:
+            result[field] = getattr(self, field)
+        return result
+
+    def __repr__(self):
+        counts = ', '.join(f'{field}={getattr(self, field)!r}'
+                           for field in self.FIELDS)
+        return f'Measurement({self.label!r}, {counts})'
+
+
+def measure(label=None):
+    """ Returns a Measurement to use in a with statement. Its counts are
+    filled in when the block ends.
+    """
+    return Measurement(label)
+
+
+class Profiler:
+    """ Collects comparison and chain length histograms, eg,
+
+        profiler = Profiler(sample_rate=0.1)
+        profiler.profile_finder(hash_result_finder, tested, quarantined)
+        profiler.record_chains(table, 'my table')
+        profiler.save('profile.json')
+
+    Only a sample_rate fraction of the quarantined names (picked with a
+    random.Random seeded with seed) are followed, which keeps the
+    bookkeeping down on big runs. The hot Name counts only include the
+    comparisons made by the followed lookups.
+    Profiling hooks every Name comparison, so only one finder can be
+    profiled at a time and it should run in a single thread.
+    """
+
+    def __init__(self, sample_rate=1.0, top_n=10, seed=0):
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._random = random.Random(seed)
+        # finder label -> Counter of comparisons per lookup -> lookups
+        self.lookup_histograms = {}
+        # table label -> Counter of chain length -> slots
+        self.chain_histograms = {}
+        # name string -> comparisons it was in
+        self.name_counts = collections.Counter()
+        self._lookup_counts = None
+
+    def profile_finder(self, finder, tested, quarantined, label=None):
+        """ Runs finder(tested, quarantined) and returns what it returns.
+        Each comparison that one of the followed quarantined names is in
+        counts towards that name's lookup, and those counts are added to
+        the histogram for label (the finder's name by default).
+        Lookups are told apart by their position in quarantined rather than
+        by which Name object they use, as the same Name can be in both
+        lists or in quarantined more than once, eg, with interned Names.
+        So the finder is given a copy of quarantined with a new Name at
+        each followed position, and the results hold those new Names.
+        """
+        label = label or finder.__name__
+        sample_rate = self.sample_rate
+        followed = list(quarantined)
+        # id of the followed position's own Name -> comparisons made
+        # looking it up, followed keeps those Names alive
+        self._lookup_counts = {}
+        for index, name in enumerate(followed):
+            if self._random.random() < sample_rate:
+                followed[index] = Name(name._name)
+                self._lookup_counts[id(followed[index])] = 0
+        Name.set_comparison_hook(self._record_comparison)
+        try:
+            result = finder(tested, followed)
+        finally:
+            Name.set_comparison_hook(None)
+        histogram = self.lookup_histograms.setdefault(
+            label, collections.Counter())
+        histogram.update(self._lookup_counts.values())
+        self._lookup_counts = None
+        return result
+
+    def _record_comparison(self, name, other):
+        lookup_counts = self._lookup_counts
+        key = id(name)
+        if key not in lookup_counts:
+            key = id(other)
+            if key not in lookup_counts:
+                return
+        lookup_counts[key] += 1
+        self.name_counts[name._name] += 1
+        self.name_counts[other._name] += 1
+
+    def record_chains(self, table, label=None):
+        """ Adds the chain lengths of table's slots to the histogram for
+        label (the table's class name by default).
+        """
+        label = label or type(table).__name__
+        histogram = self.chain_histograms.setdefault(
+            label, collections.Counter())
+        histogram.update(table.chain_lengths())
+
+    def top_names(self, n=None):
+        """ Returns a list of (name string, comparisons) pairs for the n
+        most compared Names, most compared first.
+        """
+        return self.name_counts.most_common(n or self.top_n)
+
+    def as_dict(self):
+        """ Returns the profile as a dict that can be saved as JSON.
+        Histogram keys are strings as JSON object keys have to be.
+        """
+        def sorted_histogram(histogram):
+            return {str(size): histogram[size] for size in sorted(histogram)}
+
+        return {
+            'sample_rate': self.sample_rate,
+            'lookup_histograms': {
+                label: sorted_histogram(histogram)
+                for label, histogram in self.lookup_histograms.items()},
+            'chain_histograms': {
+                label: sorted_histogram(histogram)
+                for label, histogram in self.chain_histograms.items()},
+            'top_names': self.top_names(),
+        }
+
+    def save(self, filename):
+        """ Writes the profile to filename as JSON """
+        with open(filename, 'w') as profile_file:
+            json.dump(self.as_dict(), profile_file, indent=2)
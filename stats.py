@@ -5,6 +5,8 @@ of comparisons made between Name objects.
 IMPORTANT - You shouldn't refer to _stats_, get_count in the answer you submit 
 to the quiz server. They won't be available!
 """
+import threading
+import weakref
 
 
 # Set marking mode to False for testing
@@ -19,6 +21,11 @@ HASH_TABLES_CREATED = 'hash_tables_created'
 class StatCounter:
     """ Used to help you check your comparison count
     You shouldn't use this in your answer code as it won't work!
+    Each thread counts into its own shard of the stats so threads running
+    finders at the same time don't race on one dict. get_count adds up
+    every thread's shard, get_local_count only looks at the calling thread's.
+    When a thread ends its counts are added to a retired total and its
+    shard is dropped, so pools of short-lived threads don't pile up shards.
     """
 
     if not IS_MARKING_MODE:
@@ -27,53 +34,114 @@ class StatCounter:
     else:
         _stats = {NAME_COMPS: ERROR, HASH_TABLES_CREATED: ERROR}
         _locks = {NAME_COMPS: ERROR, HASH_TABLES_CREATED: ERROR}
+    # id of a live thread's shard -> the shard, a dict like _stats,
+    # guarded by _shards_lock along with _retired
+    _shards = {}
+    # the counts of threads that have ended
+    _retired = dict.fromkeys(_stats, 0)
+    _shards_lock = threading.Lock()
+    _local = threading.local()
 
     def __init__(self, *args, **kwargs):
         raise TypeError("The StatCounter class should never be initialized!")
 
+    @classmethod
+    def _local_shard(cls):
+        """ Returns the calling thread's shard, making it the first time """
+        try:
+            return cls._local.stats
+        except AttributeError:
+            shard = dict.fromkeys(cls._stats, 0)
+            with cls._shards_lock:
+                cls._shards[id(shard)] = shard
+            # the thread's local values are freed when it ends, which
+            # retires the shard
+            owner = _ShardOwner()
+            weakref.finalize(owner, cls._retire_shard, shard)
+            cls._local.owner = owner
+            cls._local.stats = shard
+            return shard
+
+    @classmethod
+    def _retire_shard(cls, shard):
+        """ Adds an ended thread's counts to _retired and drops its shard """
+        with cls._shards_lock:
+            del cls._shards[id(shard)]
+            for counter, count in shard.items():
+                cls._retired[counter] += count
+
     @classmethod
     def increment(cls, counter):
         if not IS_MARKING_MODE:
             if not cls._locks[counter]:
-                cls._stats[counter] += 1
+                try:
+                    cls._local.stats[counter] += 1
+                except AttributeError:
+                    cls._local_shard()[counter] += 1
         else:
             cls._stats[counter] = ERROR
 
     @classmethod
     def get_count(cls, counter):
+        """ Returns the count summed over every thread """
+        if not IS_MARKING_MODE:
+            with cls._shards_lock:
+                return cls._retired[counter] + sum(
+                    shard[counter] for shard in cls._shards.values())
+        else:
+            # you shouldn't be using this in your final code!
+            raise ValueError(ERROR)
+
+    @classmethod
+    def get_local_count(cls, counter):
+        """ Returns the count made by the calling thread only """
         if not IS_MARKING_MODE:
-            return cls._stats[counter]
+            return cls._local_shard()[counter]
         else:
             # you shouldn't be using this in your final code!
             raise ValueError(ERROR)
 
     @classmethod
     def set_count(cls, counter, count):
+        """ Sets the total count, ie, what get_count returns, by zeroing the
+        other threads' shards and putting count in the calling thread's.
+        """
         if not IS_MARKING_MODE:
             if not cls._locks[counter]:
-                cls._stats[counter] = count
+                cls._set_shards(counter, 0)
+                cls._local_shard()[counter] = count
         else:
             # you shouldn't be using this in your final code!
             raise ValueError(ERROR)
 
+    @classmethod
+    def _set_shards(cls, counter, count):
+        """ Sets counter to count in every live thread's shard and clears
+        the retired count for it
+        """
+        with cls._shards_lock:
+            cls._retired[counter] = 0
+            for shard in cls._shards.values():
+                shard[counter] = count
+
     @classmethod
     def reset_counts(cls):
-        """ Resets all counters.
+        """ Resets all counters in every thread.
             Always works, even when locked """
         if not IS_MARKING_MODE:
             for item in cls._stats:
-                cls._stats[item] = 0
+                cls._set_shards(item, 0)
         else:
             for item in cls._stats:
                 cls._stats[item] = ERROR
 
     @classmethod
     def reset_count(cls, counter):
-        """ Resets the count for just the given counter.
+        """ Resets the count for just the given counter in every thread.
             Works even when locked
         """
         if not IS_MARKING_MODE:
-            cls._stats[counter] = 0
+            cls._set_shards(counter, 0)
         else:
             # you shouldn't be using this in your final code!
             cls._stats[counter] = ERROR
@@ -95,3 +163,8 @@ class StatCounter:
         else:
             raise ValueError(ERROR)
 
+
+class _ShardOwner:
+    """ Kept in a thread's StatCounter._local so that its shard can be
+    retired when the thread ends, see StatCounter._local_shard
+    """
@@ -1,15 +1,37 @@
 """Module containing the unit tests for the result getting functions."""
 import signal
 import os
+import tracemalloc
+import tempfile
 import shutil
 import tools
 import unittest
 import math
-from classes2 import Name
-from dual_module import dual_result_finder
-from hash_module import HashTable, hash_result_finder
+import random
+import gc
+import json
+import threading
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from classes2 import Name, Node
+from adaptive_module import adaptive_result_finder, FINDERS
+from adaptive_module import estimate_costs, sample_sortedness, CHECK
+from benchmarks import compare_results, measure_finder
+from binary_module import binary_result_finder, batched_binary_result_finder
+from binary_module import EytzingerIndex, eytzinger_result_finder
+from dual_module import dual_result_finder, galloping_result_finder
+from linear_module import linear_result_finder, indexed_linear_result_finder
+import vector_module
+from vector_module import vector_result_finder
+from hash_module import HashTable, OpenAddressHashTable, MappedHashTable
+from hash_module import hash_result_finder, sharded_hash_result_finder
+from hash_module import iter_hash_results
+from profiling import measure, Profiler
+from hash_functions import HASH_FUNCTIONS, SeededHash, xxhash32, fnv1a_hash
 from stats import IS_MARKING_MODE, NAME_COMPS, HASH_TABLES_CREATED, StatCounter
 from tools import read_test_data, make_name_list, make_tested_list
+from tools import iter_test_data, convert_test_data, read_binary_test_data
+from tools import generate_test_data
 
 
 actual_count = StatCounter.get_count
@@ -31,6 +53,28 @@ def intersect_size_from_filename(filename):
     return int(bits[3])
 
 
+def make_sample_lists(tested_size, quarantined_size, seed=1,
+                      sort_tested=True, sort_quarantined=True, repeats=False):
+    """ Returns a tested list and a quarantined list of Names sampled from
+    tested_size + quarantined_size made up names, eg, 'name000042'.
+    The tested names are all different. With repeats=True a quarantined name
+    can come up more than once.
+    """
+    generator = random.Random(seed)
+    universe = [f'name{i:06}' for i in range(tested_size + quarantined_size)]
+    tested_strings = generator.sample(universe, tested_size)
+    if repeats:
+        quarantined_strings = generator.choices(universe, k=quarantined_size)
+    else:
+        quarantined_strings = generator.sample(universe, quarantined_size)
+    if sort_tested:
+        tested_strings.sort()
+    if sort_quarantined:
+        quarantined_strings.sort()
+    return (make_tested_list(tested_strings),
+            make_name_list(quarantined_strings))
+
+
 def tested_size_from_filename(filename):
     """ Returns the number of people in the tested list
     eg
@@ -503,6 +547,1012 @@ class HashTableTests(BaseTester):
         self.assertEqual(table.comparisons_used, 4)
 
 
+class NameHashCacheTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+
+    def test_hash_computed_once(self):
+        lee = Name('Lee')
+        self.assertEqual(hash(lee), 959489702)
+        self.assertEqual(hash(lee), 959489702)
+        self.assertEqual(hash(lee), 959489702)
+        # every call is still counted as a hash used
+        self.assertEqual(Name.get_hashes(), 3)
+        self.assertEqual(Name.get_hashes_computed(), 1)
+        self.assertEqual(Name.get_hash_cache_hits(), 2)
+
+    def test_equal_names_hashed_separately(self):
+        # the cache is per Name object, not per string
+        hash(Name('Lee'))
+        hash(Name('Lee'))
+        self.assertEqual(Name.get_hashes_computed(), 2)
+        self.assertEqual(Name.get_hash_cache_hits(), 0)
+
+    def test_table_stores_use_cache(self):
+        table = HashTable(11)
+        fee = Name('Fee')
+        table.store_pair(fee, 1)
+        table.store_pair(fee, 2)
+        self.assertEqual(Name.get_hashes(), 2)
+        self.assertEqual(Name.get_hashes_computed(), 1)
+        self.assertEqual(Name.get_hash_cache_hits(), 1)
+
+    def test_reset_hashes(self):
+        lee = Name('Lee')
+        hash(lee)
+        hash(lee)
+        Name.reset_hashes()
+        self.assertEqual(Name.get_hashes(), 0)
+        self.assertEqual(Name.get_hashes_computed(), 0)
+        self.assertEqual(Name.get_hash_cache_hits(), 0)
+
+
+class LongChainTests(BaseTester):
+
+    CHAIN_LENGTH = 20000  # well past the default recursion limit
+
+    def test_node_len_and_repr(self):
+        head = None
+        for i in range(self.CHAIN_LENGTH):
+            head = Node(i, i, head)
+        self.assertEqual(len(head), self.CHAIN_LENGTH)
+        text = repr(head)
+        self.assertTrue(text.startswith(f'{self.CHAIN_LENGTH - 1}:'))
+        self.assertTrue(text.endswith('0:0 -> None'))
+        self.assertEqual(text.count(' -> '), self.CHAIN_LENGTH)
+
+    def test_short_node_repr(self):
+        node = Node(Name('Lee'), 1, Node(Name('Dee'), 2))
+        self.assertEqual(repr(node), '<Lee>:1 -> <Dee>:2 -> None')
+        self.assertEqual(len(node), 2)
+
+    def test_table_with_one_long_chain(self):
+        table = HashTable(1)
+        for i in range(self.CHAIN_LENGTH):
+            table.store_pair(Name(f'name{i}'), i)
+        lines = list(table.iter_lines())
+        self.assertEqual(lines[0], 'HashTable:')
+        self.assertEqual(lines[-3], f'Num of items = {self.CHAIN_LENGTH}')
+        self.assertEqual(str(table), '\n'.join(lines))
+
+    def test_dump_matches_str(self):
+        table = HashTable(11)
+        for i in range(30):
+            table.store_pair(Name(f'name{i}'), i)
+        with tempfile.TemporaryFile('w+') as dump_file:
+            table.dump(dump_file)
+            dump_file.seek(0)
+            self.assertEqual(dump_file.read(), str(table) + '\n')
+
+
+class _DictName:
+    """ Name's attributes in a per instance __dict__, for RecordMemoryTests """
+
+    def __init__(self, base):
+        self._name = base
+        self._hash = None
+
+
+class _DictNode:
+    """ Node's attributes in a per instance __dict__, for RecordMemoryTests """
+
+    def __init__(self, key, value, next_node=None):
+        self.key = key
+        self.value = value
+        self.next_node = next_node
+
+
+class RecordMemoryTests(BaseTester):
+    """ Checks the slotted Name and Node use less memory per record than
+    the same attributes kept in a __dict__.
+    """
+
+    # the slotted layout must use at most this fraction of the bytes
+    # per record of the __dict__ layout
+    SAVING_BOUND = 0.9
+
+    def bytes_per_record(self, strings, name_class, node_class):
+        """ Returns the bytes per record used by a tested list made from
+        strings plus a chain node per record in a table with twice as many
+        slots, as HashTable.store_pair would make.
+        """
+        tracemalloc.start()
+        try:
+            start = tracemalloc.get_traced_memory()[0]
+            tested = [(nhi, name_class(string), True)
+                      for nhi, string in enumerate(strings)]
+            slots = [None] * (len(tested) * 2)
+            for nhi, name, result in tested:
+                slot_index = (nhi * 2) % len(slots)
+                slots[slot_index] = node_class(name, (nhi, result),
+                                               slots[slot_index])
+            used = tracemalloc.get_traced_memory()[0] - start
+        finally:
+            tracemalloc.stop()
+        return used / len(tested)
+
+    def check_saving(self, strings):
+        slotted = self.bytes_per_record(strings, Name, Node)
+        with_dict = self.bytes_per_record(strings, _DictName, _DictNode)
+        self.assertLess(slotted, with_dict * self.SAVING_BOUND,
+                        f'{slotted:.1f} bytes per record slotted vs '
+                        f'{with_dict:.1f} with a __dict__')
+
+    def test_names_and_nodes_are_slotted(self):
+        self.assertFalse(hasattr(Name('Lee'), '__dict__'))
+        self.assertFalse(hasattr(Node(Name('Lee'), 1), '__dict__'))
+
+    def test_bytes_per_record_small(self):
+        self.check_saving([f'name{i:05}' for i in range(10000)])
+
+    def test_bytes_per_record_ginormous(self):
+        test_file_location = DATA_DIR + 'test_data-100000n-10000n-10-a.txt'
+        tested, _, _ = read_test_data(test_file_location)
+        self.check_saving([name._name for _, name, _ in tested])
+
+
+class NameInternTests(BaseTester):
+
+    SMALL_DATA = ('# tested\n3\n1,Lee,True\n2,Dee,False\n3,Tom,True\n'
+                  '# quarantined\n2\nLee\nBob\n'
+                  '# expected\nLee,1,True\nBob,None,None\n')
+
+    def setUp(self):
+        super().setUp()
+        Name.clear_intern_pool()
+
+    def tearDown(self):
+        Name.clear_intern_pool()
+
+    def test_intern_shares_objects(self):
+        self.assertIs(Name.intern('Lee'), Name.intern('Lee'))
+        self.assertIsNot(Name.intern('Lee'), Name.intern('Dee'))
+
+    def test_identity_comparisons_still_counted(self):
+        lee = Name.intern('Lee')
+        same = Name.intern('Lee')
+        self.assertTrue(lee == same)
+        self.assertTrue(lee <= same)
+        self.assertTrue(lee >= same)
+        self.assertFalse(lee != same)
+        self.assertFalse(lee < same)
+        self.assertFalse(lee > same)
+        self.assertEqual(actual_count(NAME_COMPS), 6)
+
+    def test_interned_equals_plain(self):
+        self.assertEqual(Name.intern('Lee'), Name('Lee'))
+
+    def test_pool_doesnt_keep_names_alive(self):
+        lee = Name.intern('Lee')
+        self.assertIn('Lee', Name._intern_pool)
+        del lee
+        gc.collect()
+        self.assertNotIn('Lee', Name._intern_pool)
+        self.assertEqual(Name.intern('Lee'), Name('Lee'))
+
+    def test_read_test_data_interned(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, 'test_data-3n-2n-1-a.txt')
+            with open(filename, 'w') as data_file:
+                data_file.write(self.SMALL_DATA)
+            plain = read_test_data(filename)
+            interned = read_test_data(filename, intern=True)
+        self.AssertListsEqual(list(interned), list(plain))
+        tested, quarantined, expected_results = interned
+        self.assertIs(tested[0][1], quarantined[0])
+        self.assertIs(quarantined[0], expected_results[0][0])
+        self.assertIsNot(plain[0][0][1], plain[1][0])
+        # reading a file doesn't leave its Names in the global pool
+        self.assertEqual(len(Name._intern_pool), 0)
+
+
+class NameCountingTests(BaseTester):
+
+    def tearDown(self):
+        Name.set_counting(True)
+
+    def test_counting_on_by_default(self):
+        self.assertTrue(Name.is_counting())
+        self.assertTrue(Name('Dee') < Name('Lee'))
+        self.assertEqual(actual_count(NAME_COMPS), 1)
+
+    def test_counting_off(self):
+        Name.set_counting(False)
+        self.assertFalse(Name.is_counting())
+        lee, dee = Name('Lee'), Name('Dee')
+        self.assertEqual([lee == dee, lee != dee, lee < dee, lee <= dee,
+                          lee > dee, lee >= dee],
+                         [False, True, False, False, True, True])
+        self.assertEqual(sorted([lee, dee]), [dee, lee])
+        self.assertEqual(actual_count(NAME_COMPS), 0)
+
+    def test_counting_off_still_checks_types(self):
+        Name.set_counting(False)
+        with self.assertRaises(TypeError):
+            Name('Lee') < 'Lee'
+
+    def test_counting_back_on(self):
+        Name.set_counting(False)
+        Name('Lee') == Name('Lee')
+        Name.set_counting(True)
+        self.assertTrue(Name('Lee') == Name('Lee'))
+        self.assertEqual(actual_count(NAME_COMPS), 1)
+
+    def test_hash_unchanged(self):
+        Name.set_counting(False)
+        self.assertEqual(hash(Name('Lee')), 959489702)
+
+
+class OpenAddressHashTableTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+
+    def test_simple_add_and_find(self):
+        table = OpenAddressHashTable(11)
+        fee = Name('Fee')
+        table.store_pair(fee, (1234, True))
+        self.assertEqual(table.get_value(fee), (1234, True))
+        self.assertEqual(table.comparisons_used, 1)
+
+    def test_colliding_names_not_compared(self):
+        # fee, jo and bee all start probing from slot 3 but have
+        # different hashes so only the matching key is compared
+        table = OpenAddressHashTable(11)
+        fee = Name('Fee')
+        jo = Name('Jo')
+        bee = Name('Bee')
+        table.store_pair(fee, 1)
+        table.store_pair(jo, 2)
+        table.store_pair(bee, 3)
+        self.assertEqual(table.get_value(bee), 3)
+        self.assertEqual(table.get_value(fee), 1)
+        self.assertIsNone(table.get_value(Name('Dee')))
+        self.assertEqual(table.comparisons_used, 2)
+        self.assertEqual(table.comparisons_used, actual_count(NAME_COMPS))
+
+    def test_update_key_value_pair(self):
+        table = OpenAddressHashTable(11)
+        fee = Name('Fee')
+        table.store_pair(fee, 1)
+        table.store_pair(Name('Fee'), 7)
+        self.assertEqual(table.get_value(fee), 7)
+        self.assertEqual(table.load_factor(), 1 / 11)
+
+    def test_full_table(self):
+        table = OpenAddressHashTable(3)
+        table.store_pair(Name('Fee'), 1)
+        table.store_pair(Name('Jo'), 2)
+        with self.assertRaises(ValueError):
+            table.store_pair(Name('Bee'), 3)
+
+    def test_save_not_supported(self):
+        table = OpenAddressHashTable(11)
+        table.store_pair(Name('Fee'), (1, True))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(TypeError):
+                table.save(os.path.join(temp_dir, 'table.bin'))
+
+    def test_memory_used(self):
+        table = OpenAddressHashTable(11)
+        table.store_pair(Name('Fee'), 1)
+        # the _hashes, _keys and _values lists each have a pointer per slot
+        self.assertEqual(HashTable.get_memory_used(), 33)
+
+    def test_hash_result_finder_engines_agree(self):
+        tested = make_tested_list(f'name{i}' for i in range(0, 400, 2))
+        quarantined = make_name_list(f'name{i}' for i in range(0, 400, 7))
+        chained, chained_comps = hash_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        open_results, open_comps = hash_result_finder(
+            tested, quarantined, table_class=OpenAddressHashTable)
+        self.AssertListsEqual(open_results, chained)
+        self.assertEqual(open_comps, actual_count(NAME_COMPS))
+        self.assertLessEqual(open_comps, chained_comps)
+
+
+class ResizingHashTableTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+        self.names = make_name_list(f'name{i}' for i in range(100))
+
+    def fill(self, table):
+        for i, name in enumerate(self.names):
+            table.store_pair(name, i)
+
+    def check_all_found(self, table):
+        for i, name in enumerate(self.names):
+            self.assertEqual(table.get_value(name), i)
+
+    def test_no_resize_by_default(self):
+        table = HashTable(11)
+        self.fill(table)
+        self.assertEqual(table.number_of_slots, 11)
+
+    def test_one_shot_growth(self):
+        table = HashTable(4, max_load_factor=1.0)
+        self.fill(table)
+        self.assertEqual(table.number_of_slots, 128)
+        self.assertLessEqual(table.load_factor(), 1.0)
+        self.assertEqual(HashTable.get_memory_used(), 128 + 100)
+        self.check_all_found(table)
+        self.assertEqual(table.comparisons_used, actual_count(NAME_COMPS))
+
+    def test_incremental_growth(self):
+        table = HashTable(4, max_load_factor=1.0, incremental=True)
+        for i, name in enumerate(self.names):
+            table.store_pair(name, i)
+            # everything stored so far can be found part way through a rehash
+            self.assertEqual(table.get_value(self.names[0]), 0)
+            self.assertEqual(table.get_value(name), i)
+        self.check_all_found(table)
+        table.finish_rehash()
+        self.assertEqual(table.number_of_slots, 128)
+        self.assertEqual(HashTable.get_memory_used(), 128 + 100)
+        self.assertEqual(table.comparisons_used, actual_count(NAME_COMPS))
+
+    def test_incremental_keeps_newest_value(self):
+        table = HashTable(4, incremental=True)
+        self.fill(table)
+        table.resize(64)
+        # the new value is stored before the old slots have been moved
+        table.store_pair(Name('name0'), 'new')
+        table.finish_rehash()
+        self.assertEqual(table.get_value(self.names[0]), 'new')
+
+    def test_shrink_on_remove(self):
+        table = HashTable(4, max_load_factor=1.0, min_load_factor=0.25)
+        self.fill(table)
+        for i, name in enumerate(self.names[:90]):
+            self.assertEqual(table.remove(name), i)
+        self.assertIsNone(table.remove(self.names[0]))
+        self.assertLess(table.number_of_slots, 128)
+        self.assertGreaterEqual(table.load_factor(), 0.25)
+        self.assertEqual(HashTable.get_memory_used(),
+                         table.number_of_slots + 10)
+        for i, name in enumerate(self.names[90:], 90):
+            self.assertEqual(table.get_value(name), i)
+
+
+class BulkBuildTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+        self.pairs = [(Name('Fee'), 1), (Name('Jo'), 2), (Name('Bee'), 3),
+                      (Name('Dee'), 4), (Name('Fee'), 5)]
+
+    def test_same_as_store_pair(self):
+        # 5 pairs at a load factor of 0.5 gives 10 slots
+        table = HashTable(10)
+        for key, value in self.pairs:
+            table.store_pair(key, value)
+        bulk = HashTable.from_pairs(self.pairs, load_factor=0.5)
+        self.assertEqual(bulk.number_of_slots, 10)
+        self.assertEqual(str(bulk), str(table))
+        self.assertEqual(bulk.get_value(Name('Fee')), 5)
+
+    def test_counters(self):
+        HashTable.from_pairs(self.pairs, load_factor=0.5)
+        self.assertEqual(HashTable.get_memory_used(), 10 + 5)
+        self.assertEqual(Name.get_hashes(), 5)
+        self.assertEqual(actual_count(HASH_TABLES_CREATED), 1)
+
+    def test_iterator_with_size(self):
+        bulk = HashTable.from_pairs(iter(self.pairs), load_factor=1, size=5)
+        self.assertEqual(bulk.number_of_slots, 5)
+        self.assertEqual(bulk.load_factor(), 1)
+
+    def test_open_address_from_pairs(self):
+        bulk = OpenAddressHashTable.from_pairs(self.pairs, load_factor=0.5)
+        self.assertEqual(bulk.number_of_slots, 10)
+        self.assertEqual(bulk.get_value(Name('Fee')), 5)
+        self.assertEqual(bulk.get_value(Name('Dee')), 4)
+
+
+class GetManyTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+        # fee, jo and bee hash to slot 3 and dee to another slot
+        self.table = HashTable(11)
+        for value, name in enumerate(['Fee', 'Jo', 'Bee', 'Dee']):
+            self.table.store_pair(Name(name), value)
+
+    def test_values_in_key_order(self):
+        keys = make_name_list(['Dee', 'Fee', 'Tom', 'Bee', 'Fee'])
+        self.assertEqual(self.table.get_many(keys), [3, 0, None, 2, 0])
+
+    def test_same_comparisons_as_get_value(self):
+        keys = make_name_list(['Dee', 'Fee', 'Tom', 'Bee', 'Jo'])
+        single = HashTable(11)
+        for value, name in enumerate(['Fee', 'Jo', 'Bee', 'Dee']):
+            single.store_pair(Name(name), value)
+        expected = [single.get_value(key) for key in keys]
+        StatCounter.reset_counts()
+        self.assertEqual(self.table.get_many(keys), expected)
+        self.assertEqual(self.table.comparisons_used, single.comparisons_used)
+        self.assertEqual(self.table.comparisons_used, actual_count(NAME_COMPS))
+
+    def test_each_key_hashed_once(self):
+        Name.reset_hashes()
+        self.table.get_many(make_name_list(['Dee', 'Fee', 'Tom']))
+        self.assertEqual(Name.get_hashes(), 3)
+
+    def test_repeated_names_looked_up_once(self):
+        single = HashTable(11)
+        for value, name in enumerate(['Fee', 'Jo', 'Bee', 'Dee']):
+            single.store_pair(Name(name), value)
+        jo = Name('Jo')
+        # repeats in the same object and in separate objects, as read from
+        # a file
+        keys = [jo] + make_name_list(['Fee', 'Jo', 'Tom', 'Fee', 'Tom'])
+        keys.append(jo)
+        expected = [single.get_value(key) for key in keys]
+        Name.reset_hashes()
+        StatCounter.reset_counts()
+        self.assertEqual(self.table.get_many(keys), expected)
+        self.assertEqual(Name.get_hashes(), 3)
+        self.assertEqual(self.table.comparisons_used, actual_count(NAME_COMPS))
+        self.assertLess(self.table.comparisons_used, single.comparisons_used)
+
+    def test_empty_keys(self):
+        self.assertEqual(self.table.get_many([]), [])
+        self.assertEqual(self.table.comparisons_used, 0)
+
+
+class MappedHashTableTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'table.bin')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_same_results_and_comparisons(self):
+        tested = make_tested_list(f'name{i}' for i in range(0, 300, 3))
+        table = HashTable.from_pairs(
+            ((name, (nhi, result)) for nhi, name, result in tested), 0.5)
+        table.save(self.filename)
+        keys = make_name_list(f'name{i}' for i in range(300))
+        expected = [table.get_value(key) for key in keys]
+        StatCounter.reset_counts()
+        with MappedHashTable(self.filename) as mapped:
+            self.assertEqual(mapped.number_of_slots, table.number_of_slots)
+            self.assertEqual(mapped.load_factor(), table.load_factor())
+            self.assertEqual(mapped.get_many(keys), expected)
+            self.assertEqual(mapped.comparisons_used, table.comparisons_used)
+            self.assertEqual(mapped.comparisons_used, actual_count(NAME_COMPS))
+
+    def test_chain_order_kept(self):
+        # fee, jo and bee all hash to the same slot
+        table = HashTable(11)
+        table.store_pair(Name('Fee'), (1, True))
+        table.store_pair(Name('Jo'), (2, None))
+        table.store_pair(Name('Bee'), (3, False))
+        table.store_pair(Name('Fee'), (4, False))
+        table.save(self.filename)
+        with MappedHashTable(self.filename) as mapped:
+            self.assertEqual(mapped.get_value(Name('Fee')), (4, False))
+            self.assertEqual(mapped.get_value(Name('Jo')), (2, None))
+            self.assertIsNone(mapped.get_value(Name('Dee')))
+            self.assertEqual(mapped.comparisons_used, 1 + 3)
+
+    def test_only_names_and_results_saved(self):
+        table = HashTable(11)
+        table.store_pair(Name('Fee'), 1)
+        with self.assertRaises(TypeError):
+            table.save(self.filename)
+        table = HashTable(11)
+        table.store_pair('Fee', (1, True))
+        with self.assertRaises(TypeError):
+            table.save(self.filename)
+
+    def test_not_a_table_file(self):
+        with open(self.filename, 'wb') as table_file:
+            table_file.write(b'\0' * 64)
+        with self.assertRaises(ValueError):
+            MappedHashTable(self.filename)
+
+    def test_short_files_closed(self):
+        table = HashTable.from_pairs((Name(f'name{i}'), (i, True))
+                                     for i in range(10))
+        table.save(self.filename)
+        with open(self.filename, 'rb') as table_file:
+            saved = table_file.read()
+        # empty, part of the header and a whole header missing its records
+        for length in (0, 20, 40, len(saved) - 1):
+            with open(self.filename, 'wb') as table_file:
+                table_file.write(saved[:length])
+            with warnings.catch_warnings(record=True) as caught:
+                warnings.simplefilter('always', ResourceWarning)
+                with self.assertRaises(ValueError):
+                    MappedHashTable(self.filename)
+                gc.collect()
+            self.assertEqual(caught, [])
+
+
+class ThreadedStatCounterTests(BaseTester):
+
+    def run_finder(self, finder, size):
+        """ Runs finder on its own lists and returns the comparisons it
+        reported along with the comparisons this thread counted.
+        """
+        tested = tools.make_tested_list(f'name{i:05}' for i in range(size))
+        quarantined = tools.make_name_list(f'name{i:05}'
+                                           for i in range(0, 2 * size, 3))
+        before = StatCounter.get_local_count(NAME_COMPS)
+        _, comparisons = finder(tested, quarantined)
+        return comparisons, StatCounter.get_local_count(NAME_COMPS) - before
+
+    def test_concurrent_finders_counted_exactly(self):
+        jobs = [(binary_result_finder, size) for size in range(50, 450, 50)]
+        jobs += [(dual_result_finder, size) for size in range(50, 450, 50)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            counts = list(executor.map(lambda job: self.run_finder(*job), jobs))
+        for comparisons, local_count in counts:
+            self.assertEqual(comparisons, local_count)
+        self.assertEqual(actual_count(NAME_COMPS),
+                         sum(local_count for _, local_count in counts))
+
+    def test_reset_clears_other_threads(self):
+        thread = threading.Thread(target=lambda: Name('Lee') == Name('Dee'))
+        thread.start()
+        thread.join()
+        Name('Lee') < Name('Dee')
+        self.assertEqual(actual_count(NAME_COMPS), 2)
+        self.assertEqual(StatCounter.get_local_count(NAME_COMPS), 1)
+        StatCounter.reset_counts()
+        self.assertEqual(actual_count(NAME_COMPS), 0)
+
+    def test_ended_threads_retired(self):
+        live_shards = len(StatCounter._shards)
+        for _ in range(20):
+            thread = threading.Thread(
+                target=lambda: Name('Lee') == Name('Dee'))
+            thread.start()
+            thread.join()
+        # the ended threads' shards are gone but their counts are kept
+        self.assertEqual(len(StatCounter._shards), live_shards)
+        self.assertEqual(actual_count(NAME_COMPS), 20)
+        StatCounter.reset_counts()
+        self.assertEqual(actual_count(NAME_COMPS), 0)
+
+    def test_set_count_sets_total(self):
+        thread = threading.Thread(target=lambda: Name('Lee') == Name('Dee'))
+        thread.start()
+        thread.join()
+        StatCounter.set_count(NAME_COMPS, 10)
+        self.assertEqual(actual_count(NAME_COMPS), 10)
+        Name('Lee') == Name('Dee')
+        self.assertEqual(actual_count(NAME_COMPS), 11)
+
+
+class MeasureTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        Name.reset_hashes()
+        HashTable.reset_memory_used()
+
+    def test_counts_only_inside_block(self):
+        Name('Lee') == Name('Dee')
+        with measure('compare') as measurement:
+            Name('Lee') < Name('Dee')
+            hash(Name('Lee'))
+        Name('Lee') > Name('Dee')
+        self.assertEqual(measurement.label, 'compare')
+        self.assertEqual(measurement.comparisons, 1)
+        self.assertEqual(measurement.hashes, 1)
+        self.assertEqual(measurement.hashes_computed, 1)
+        self.assertEqual(measurement.hash_tables_created, 0)
+        self.assertEqual(measurement.memory_used, 0)
+        self.assertGreaterEqual(measurement.elapsed, 0)
+
+    def test_nested_phases(self):
+        tested = tools.make_tested_list(f'name{i}' for i in range(100))
+        pairs = [(name, (nhi, result)) for nhi, name, result in tested]
+        keys = tools.make_name_list(f'name{i}' for i in range(0, 200, 7))
+        with measure() as total:
+            with measure() as build:
+                table = HashTable.from_pairs(pairs)
+            with measure() as lookups:
+                table.get_many(keys)
+        self.assertEqual(build.hash_tables_created, 1)
+        self.assertEqual(build.memory_used, HashTable.get_memory_used())
+        self.assertEqual(lookups.memory_used, 0)
+        self.assertEqual(lookups.hashes, len(keys))
+        for field in ('comparisons', 'hashes', 'hash_tables_created',
+                      'memory_used'):
+            self.assertEqual(getattr(total, field),
+                             getattr(build, field) + getattr(lookups, field))
+
+    def test_counters_not_reset(self):
+        Name('Lee') == Name('Dee')
+        with measure():
+            pass
+        self.assertEqual(actual_count(NAME_COMPS), 1)
+
+    def test_as_dict(self):
+        with measure('empty') as measurement:
+            pass
+        result = measurement.as_dict()
+        self.assertEqual(result['label'], 'empty')
+        self.assertEqual(result['comparisons'], 0)
+
+
+class ProfilerTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        self.tested = tools.make_tested_list(f'name{i:04}'
+                                             for i in range(0, 400, 2))
+        self.quarantined = tools.make_name_list(f'name{i:04}'
+                                                for i in range(0, 400, 5))
+
+    def tearDown(self):
+        Name.set_comparison_hook(None)
+
+    def test_lookup_histogram_matches_comparisons(self):
+        profiler = Profiler()
+        results, comparisons = profiler.profile_finder(
+            binary_result_finder, self.tested, self.quarantined)
+        expected, _ = dual_result_finder(self.tested, self.quarantined)
+        self.AssertListsEqual(results, expected)
+        histogram = profiler.lookup_histograms['binary_result_finder']
+        self.assertEqual(sum(histogram.values()), len(self.quarantined))
+        self.assertEqual(sum(size * lookups
+                             for size, lookups in histogram.items()),
+                         comparisons)
+
+    def test_shared_names_kept_apart(self):
+        # interned data shares Names between the lists and repeats them
+        tested = tools.make_tested_list(f'name{i:04}' for i in range(100))
+        quarantined = [record[1] for record in tested[::10]] * 11
+        profiler = Profiler()
+        results, comparisons = profiler.profile_finder(
+            hash_result_finder, tested, quarantined)
+        expected, _ = hash_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+        histogram = profiler.lookup_histograms['hash_result_finder']
+        self.assertEqual(sum(histogram.values()), 110)
+        self.assertEqual(sum(size * lookups
+                             for size, lookups in histogram.items()),
+                         comparisons)
+
+    def test_hook_removed_afterwards(self):
+        profiler = Profiler()
+        profiler.profile_finder(hash_result_finder, self.tested,
+                                self.quarantined, label='hash')
+        self.assertIn('hash', profiler.lookup_histograms)
+        self.assertTrue(Name.is_counting())
+        before = len(profiler.name_counts)
+        Name('Lee') == Name('Dee')
+        self.assertEqual(len(profiler.name_counts), before)
+
+    def test_counting_mode_kept(self):
+        Name.set_counting(False)
+        try:
+            profiler = Profiler()
+            profiler.profile_finder(binary_result_finder, self.tested,
+                                    self.quarantined)
+            self.assertFalse(Name.is_counting())
+            self.assertEqual(actual_count(NAME_COMPS), 0)
+            histogram = profiler.lookup_histograms['binary_result_finder']
+            self.assertEqual(sum(histogram.values()), len(self.quarantined))
+        finally:
+            Name.set_counting(True)
+
+    def test_sampling(self):
+        profiler = Profiler(sample_rate=0.25)
+        profiler.profile_finder(binary_result_finder, self.tested,
+                                self.quarantined)
+        histogram = profiler.lookup_histograms['binary_result_finder']
+        self.assertLess(sum(histogram.values()), len(self.quarantined))
+        self.assertGreater(sum(histogram.values()), 0)
+
+    def test_top_names(self):
+        profiler = Profiler(top_n=1)
+        profiler.profile_finder(binary_result_finder, self.tested,
+                                self.quarantined)
+        # every binary search starts at the middle record
+        middle = self.tested[(len(self.tested) - 1) // 2][1]
+        self.assertEqual(profiler.top_names()[0][0], middle._name)
+
+    def test_chain_lengths(self):
+        table = HashTable(7)
+        for i in range(20):
+            table.store_pair(Name(f'name{i}'), i)
+        lengths = table.chain_lengths()
+        self.assertEqual(len(lengths), table.number_of_slots)
+        self.assertEqual(sum(lengths), 20)
+        open_table = OpenAddressHashTable(31)
+        for i in range(20):
+            open_table.store_pair(Name(f'name{i}'), i)
+        open_lengths = open_table.chain_lengths()
+        self.assertEqual(sum(1 for length in open_lengths if length), 20)
+        self.assertEqual(min(length for length in open_lengths if length), 1)
+
+    def test_save_json(self):
+        profiler = Profiler()
+        profiler.profile_finder(hash_result_finder, self.tested,
+                                self.quarantined)
+        table = HashTable.from_pairs(
+            (name, nhi) for nhi, name, _ in self.tested)
+        profiler.record_chains(table)
+        with tempfile.TemporaryDirectory() as temp_dir:
+            filename = os.path.join(temp_dir, 'profile.json')
+            profiler.save(filename)
+            with open(filename) as profile_file:
+                saved = json.load(profile_file)
+        self.assertEqual(sum(saved['chain_histograms']['HashTable'].values()),
+                         table.number_of_slots)
+        self.assertEqual(
+            sum(saved['lookup_histograms']['hash_result_finder'].values()),
+            len(self.quarantined))
+
+
+class HashFunctionTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        self.tested = tools.make_tested_list(f'name{i}' for i in range(300))
+        random.Random(1).shuffle(self.tested)
+        self.quarantined = tools.make_name_list(f'name{i}'
+                                                for i in range(0, 600, 7))
+        # the default hash is the one the other hash finder tests check
+        self.expected, _ = hash_result_finder(self.tested, self.quarantined)
+        Name.reset_hashes()
+        self.hash_functions = list(HASH_FUNCTIONS.values()) + [SeededHash(7)]
+
+    def test_finder_results_same_for_every_hash(self):
+        for hash_function in self.hash_functions:
+            for table_class in (HashTable, OpenAddressHashTable):
+                results, _ = hash_result_finder(
+                    self.tested, self.quarantined, table_class=table_class,
+                    hash_function=hash_function)
+                self.AssertListsEqual(results, self.expected)
+
+    def test_comparisons_counted(self):
+        for hash_function in self.hash_functions:
+            StatCounter.reset_counts()
+            _, comparisons = hash_result_finder(self.tested, self.quarantined,
+                                                hash_function=hash_function)
+            self.assertEqual(comparisons, actual_count(NAME_COMPS))
+
+    def test_resizing_with_hash_function(self):
+        table = HashTable(2, max_load_factor=1.0, min_load_factor=0.25,
+                          incremental=True, hash_function=fnv1a_hash)
+        names = [Name(f'name{i}') for i in range(100)]
+        for i, name in enumerate(names):
+            table.store_pair(name, i)
+        for i, name in enumerate(names):
+            self.assertEqual(table.get_value(name), i)
+        for i, name in enumerate(names[:90]):
+            self.assertEqual(table.remove(name), i)
+        self.assertEqual(table.get_many(names[90:]), list(range(90, 100)))
+
+    def test_name_hashes_not_used(self):
+        hash_result_finder(self.tested, self.quarantined,
+                           hash_function=fnv1a_hash)
+        self.assertEqual(Name.get_hashes(), 0)
+
+    def test_seeds_spread_differently(self):
+        names = [Name(f'name{i}') for i in range(50)]
+        self.assertNotEqual([SeededHash(1)(name) for name in names],
+                            [SeededHash(2)(name) for name in names])
+        self.assertEqual(SeededHash(0)('Lee'), xxhash32('Lee'))
+
+    def test_xxhash_known_values(self):
+        self.assertEqual(xxhash32(''), 0x02CC5D05)
+        self.assertEqual(xxhash32('Nobody inspects the spammish repetition'),
+                         0xE2293B2F)
+
+    def test_save_needs_name_hash(self):
+        table = HashTable(5, hash_function=fnv1a_hash)
+        table.store_pair(Name('Lee'), (1, True))
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(TypeError):
+                table.save(os.path.join(temp_dir, 'table.bin'))
+
+
+class ShardedHashTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        self.tested = make_tested_list(f'name{i}' for i in range(0, 2000, 2))
+        self.quarantined = make_name_list(f'name{i}' for i in range(0, 600, 3))
+
+    def test_same_results_as_hash_result_finder(self):
+        expected, _ = hash_result_finder(self.tested, self.quarantined)
+        results, comparisons = sharded_hash_result_finder(
+            self.tested, self.quarantined, num_shards=3)
+        self.AssertListsEqual(results, expected)
+        # the results hold the original quarantined Names
+        self.assertIs(results[0][0], self.quarantined[0])
+        self.assertGreaterEqual(comparisons, 100)
+
+    def test_names_hashed_by_workers(self):
+        Name.reset_hashes()
+        sharded_hash_result_finder(self.tested, self.quarantined,
+                                   num_shards=3)
+        self.assertEqual(Name.get_hashes(), 0)
+
+    def test_one_shard_runs_in_process(self):
+        expected, expected_comps = hash_result_finder(self.tested,
+                                                      self.quarantined)
+        StatCounter.reset_counts()
+        results, comparisons = sharded_hash_result_finder(
+            self.tested, self.quarantined, num_shards=1)
+        self.AssertListsEqual(results, expected)
+        self.assertEqual(comparisons, expected_comps)
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+
+    def test_empty_lists(self):
+        self.assertEqual(sharded_hash_result_finder([], [], num_shards=2),
+                         ([], 0))
+        results, comparisons = sharded_hash_result_finder(
+            [], self.quarantined[:2], num_shards=2)
+        self.AssertListsEqual(results, [(name, None, None)
+                                        for name in self.quarantined[:2]])
+        self.assertEqual(comparisons, 0)
+
+
+class StreamingReaderTests(BaseTester):
+
+    DATA = ('# tested\n4\n1,Lee,True\n2,Dee,False\n# comment\n3,Tom,True\n'
+            '4,Fee,False\n# quarantined\n3\nTom\nBob\nFee\n'
+            '# expected\nTom,3,True\nBob,None,None\nFee,4,False\n')
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name,
+                                     'test_data-4n-3n-2-a.txt')
+        with open(self.filename, 'w') as data_file:
+            data_file.write(self.DATA)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sections_match_read_test_data(self):
+        expected = read_test_data(self.filename)
+        sections = [(size, list(records))
+                    for size, records in iter_test_data(self.filename)]
+        self.assertEqual([size for size, records in sections], [4, 3, 3])
+        self.AssertListsEqual([records for size, records in sections],
+                              list(expected))
+
+    def test_unread_sections_are_skipped(self):
+        sections = iter_test_data(self.filename)
+        tested_size, tested = next(sections)
+        self.assertEqual(next(tested)[0], 1)
+        quarantined_size, quarantined = next(sections)
+        self.AssertListsEqual(list(quarantined),
+                              make_name_list(['Tom', 'Bob', 'Fee']))
+
+    def test_iter_hash_results(self):
+        tested, quarantined, expected = read_test_data(self.filename)
+        _, expected_comparisons = hash_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        results = []
+        stream = iter_hash_results(iter_test_data(self.filename))
+        try:
+            while True:
+                results.append(next(stream))
+        except StopIteration as finished:
+            comparisons = finished.value
+        self.AssertListsEqual(results, expected)
+        self.assertEqual(comparisons, expected_comparisons)
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+
+
+class BinaryTestDataTests(BaseTester):
+
+    DATA = ('# tested\n4\n1,Lee,True\n2,Dee,False\n3,Zoë,True\n'
+            '4,Fee,False\n# quarantined\n3\nZoë\nBob\nFee\n'
+            '# expected\nZoë,3,True\nBob,None,None\nFee,4,False\n')
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.text_filename = os.path.join(self.temp_dir.name, 'data.txt')
+        self.binary_filename = os.path.join(self.temp_dir.name, 'data.bin')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def round_trip(self, data):
+        with open(self.text_filename, 'w', encoding='utf-8') as data_file:
+            data_file.write(data)
+        convert_test_data(self.text_filename, self.binary_filename)
+        self.AssertListsEqual(list(read_binary_test_data(self.binary_filename)),
+                              list(read_test_data(self.text_filename)))
+
+    def test_round_trip(self):
+        self.round_trip(self.DATA)
+
+    def test_round_trip_empty_lists(self):
+        self.round_trip('0\n0\n')
+
+    def test_round_trip_more_than_a_byte_of_results(self):
+        tested = ''.join(f'{i},name{i},{i % 3 == 0}\n' for i in range(1, 20))
+        quarantined = ''.join(f'name{i}\n' for i in range(0, 40, 4))
+        expected = ''.join(f'name{i},{i},{i % 3 == 0}\n' if 0 < i < 20
+                           else f'name{i},None,None\n'
+                           for i in range(0, 40, 4))
+        self.round_trip(f'19\n{tested}10\n{quarantined}{expected}')
+
+    def test_not_a_binary_file(self):
+        with open(self.binary_filename, 'wb') as binary_file:
+            binary_file.write(b'0\n0\n' + b'\0' * 32)
+        with self.assertRaises(ValueError):
+            read_binary_test_data(self.binary_filename)
+
+
+class GeneratedTestDataTests(BaseTester):
+
+    def setUp(self):
+        super().setUp()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.temp_dir.name, 'generated.txt')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sizes_and_intersection(self):
+        generate_test_data(self.filename, 300, 120, 45, seed=3)
+        tested, quarantined, expected = read_test_data(self.filename)
+        self.assertEqual(len(tested), 300)
+        self.assertEqual(len(quarantined), 120)
+        found = [result for result in expected if result[1] is not None]
+        self.assertEqual(len(found), 45)
+
+    def test_lists_sorted_and_expected_correct(self):
+        generate_test_data(self.filename, 200, 80, 30, seed=4)
+        tested, quarantined, expected = read_test_data(self.filename)
+        self.assertEqual([record[0] for record in tested],
+                         list(range(1, 201)))
+        names = [record[1] for record in tested]
+        self.assertEqual(names, sorted(set(names)))
+        self.assertEqual(quarantined, sorted(set(quarantined)))
+        results, _ = dual_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+
+    def test_same_seed_same_file(self):
+        other_filename = os.path.join(self.temp_dir.name, 'other.txt')
+        generate_test_data(self.filename, 50, 20, 5, seed=7)
+        generate_test_data(other_filename, 50, 20, 5, seed=7)
+        with open(self.filename) as first, open(other_filename) as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_name_lengths_and_first_letters(self):
+        generate_test_data(self.filename, 100, 40, 10, name_lengths=(5, 7),
+                           first_letters={'Q': 1, 'X': 3})
+        tested, quarantined, _ = read_test_data(self.filename)
+        for name in [record[1] for record in tested] + quarantined:
+            self.assertIn(name._name[0], 'QX')
+            self.assertTrue(5 <= len(name._name) <= 7)
+
+    def test_bad_intersect_size(self):
+        with self.assertRaises(ValueError):
+            generate_test_data(self.filename, 10, 5, 6)
+
+
 # ------------------------------------------------------------------------------
 # These tests test your hash_result_finder function
 class BaseTestsHash(BaseTests):
@@ -808,6 +1858,36 @@ class HelpfulDualTests(BaseTester):
         self.assertEqual(comparisons, actual_count(NAME_COMPS))
 
 
+class GallopingDualTests(BaseTester):
+
+    def check_same_as_dual(self, tested_size, quarantined_size, seed=1):
+        tested, quarantined = make_sample_lists(tested_size, quarantined_size,
+                                                seed)
+        expected, dual_comparisons = dual_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        results, comparisons = galloping_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+        return comparisons, dual_comparisons
+
+    def test_empty_lists(self):
+        self.check_same_as_dual(0, 0)
+        self.check_same_as_dual(10, 0)
+        self.check_same_as_dual(0, 10)
+
+    def test_same_results_as_dual(self):
+        for seed in range(5):
+            self.check_same_as_dual(50, 10, seed)
+            self.check_same_as_dual(10, 50, seed)
+            self.check_same_as_dual(30, 30, seed)
+
+    def test_fewer_comparisons_when_skewed(self):
+        comparisons, dual_comparisons = self.check_same_as_dual(10000, 100)
+        self.assertLess(comparisons, dual_comparisons / 5)
+        comparisons, dual_comparisons = self.check_same_as_dual(100, 10000)
+        self.assertLess(comparisons, dual_comparisons / 5)
+
+
 class BaseTestsDual(BaseTests):
 
     def setUp(self):
@@ -901,6 +1981,291 @@ class DualTestsExact(BaseTestsDual):
 
 
 
+class BatchedBinaryTests(BaseTester):
+
+    def sample_lists(self, tested_size, quarantined_size, seed=1):
+        return make_sample_lists(tested_size, quarantined_size, seed,
+                                 sort_quarantined=False, repeats=True)
+
+    def check_same_as_binary(self, tested, quarantined, presorted=False):
+        expected, binary_comparisons = binary_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        results, comparisons = batched_binary_result_finder(
+            tested, quarantined, presorted)
+        self.AssertListsEqual(results, expected)
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+        return comparisons, binary_comparisons
+
+    def test_empty_lists(self):
+        tested, quarantined = self.sample_lists(0, 5)
+        self.check_same_as_binary(tested, quarantined)
+        tested, quarantined = self.sample_lists(5, 0)
+        self.check_same_as_binary(tested, quarantined)
+
+    def test_same_results_as_binary(self):
+        for seed in range(5):
+            # choices gives some repeated quarantined names
+            tested, quarantined = self.sample_lists(50, 30, seed)
+            self.check_same_as_binary(tested, quarantined)
+
+    def test_presorted_uses_fewer_comparisons(self):
+        tested, quarantined = self.sample_lists(10000, 1000)
+        quarantined.sort()
+        comparisons, binary_comparisons = self.check_same_as_binary(
+            tested, quarantined, presorted=True)
+        self.assertLess(comparisons, binary_comparisons / 2)
+
+
+class EytzingerIndexTests(BaseTester):
+
+    def test_same_results_as_binary_all_sizes(self):
+        for size in range(0, 40):
+            tested = make_tested_list([f'name{i:03}' for i in range(0, 2 * size, 2)])
+            quarantined = make_name_list(f'name{i:03}' for i in range(-1, 2 * size + 1))
+            expected, _ = binary_result_finder(tested, quarantined)
+            StatCounter.reset_counts()
+            results, comparisons = eytzinger_result_finder(tested, quarantined)
+            self.AssertListsEqual(results, expected)
+            self.assertEqual(comparisons, actual_count(NAME_COMPS))
+
+    def test_finds_first_duplicate(self):
+        tested = [(1, Name('a'), True), (2, Name('b'), True),
+                  (3, Name('b'), False), (4, Name('c'), True)]
+        index = EytzingerIndex(tested)
+        self.assertEqual(len(index), 4)
+        self.assertEqual(index.find(Name('b')), tested[1])
+        self.assertIsNone(index.find(Name('bb')))
+
+    def test_comparisons_per_lookup(self):
+        tested = make_tested_list(f'name{i:04}' for i in range(1023))
+        index = EytzingerIndex(tested)
+        index.find(Name('name0500'))
+        # one comparison for each of the 10 levels plus the equality check
+        self.assertEqual(index.comparisons_used, 11)
+
+    def test_reuse_index(self):
+        tested = make_tested_list(['a', 'b', 'c'])
+        index = EytzingerIndex(tested)
+        eytzinger_result_finder(tested, make_name_list('ab'), index)
+        results, comparisons = eytzinger_result_finder(
+            tested, make_name_list('c'), index)
+        self.AssertListsEqual(results, [(Name('c'), 3, True)])
+        self.assertEqual(comparisons, 3)
+
+
+class VectorFinderTests(BaseTester):
+
+    def sample_lists(self, tested_size, quarantined_size, seed=1):
+        return make_sample_lists(tested_size, quarantined_size, seed,
+                                 sort_tested=False, sort_quarantined=False,
+                                 repeats=True)
+
+    @unittest.skipIf(vector_module.np is None, 'NumPy is not installed')
+    def test_same_results_as_hash_and_binary(self):
+        tested, quarantined = self.sample_lists(500, 300)
+        expected, _ = hash_result_finder(tested, quarantined)
+        results, comparisons = vector_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+        tested.sort(key=lambda record: record[1])
+        StatCounter.reset_counts()
+        results, comparisons = vector_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+        # no Name comparisons are made, the count is only an estimate
+        self.assertEqual(actual_count(NAME_COMPS), 0)
+        self.assertEqual(comparisons, 300 * (9 + 1))
+
+    @unittest.skipIf(vector_module.np is None, 'NumPy is not installed')
+    def test_trailing_nul_names(self):
+        tested = make_tested_list(['a', 'b\x00'])
+        quarantined = make_name_list(['a\x00', 'b', 'b\x00', 'a'])
+        expected, _ = hash_result_finder(tested, quarantined)
+        results, _ = vector_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+
+    @unittest.skipIf(vector_module.np is None, 'NumPy is not installed')
+    def test_empty_lists_and_no_estimate(self):
+        tested, quarantined = self.sample_lists(0, 3)
+        results, comparisons = vector_result_finder(tested, quarantined, False)
+        self.AssertListsEqual(results, [(name, None, None)
+                                        for name in quarantined])
+        self.assertIsNone(comparisons)
+        tested, quarantined = self.sample_lists(3, 0)
+        self.assertEqual(vector_result_finder(tested, quarantined), ([], 0))
+
+    def test_needs_numpy(self):
+        numpy = vector_module.np
+        vector_module.np = None
+        try:
+            with self.assertRaises(ImportError):
+                vector_result_finder([], [])
+        finally:
+            vector_module.np = numpy
+
+
+class IndexedLinearTests(BaseTester):
+
+    def check_same_as_linear(self, tested, quarantined):
+        expected, linear_comparisons = linear_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        results, comparisons = indexed_linear_result_finder(tested, quarantined)
+        self.AssertListsEqual(results, expected)
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+        return comparisons, linear_comparisons
+
+    def test_empty_lists(self):
+        self.check_same_as_linear([], make_name_list('ab'))
+        self.check_same_as_linear(make_tested_list('ab'), [])
+
+    def test_same_results_as_linear(self):
+        generator = random.Random(1)
+        universe = [f'name{i}' for i in range(60)]
+        for _ in range(5):
+            tested = make_tested_list(generator.sample(universe, 40))
+            quarantined = make_name_list(generator.choices(universe, k=30))
+            self.check_same_as_linear(tested, quarantined)
+
+    def test_first_duplicate_used(self):
+        tested = [(1, Name('b'), True), (2, Name('a'), True),
+                  (3, Name('b'), False)]
+        results, comparisons = self.check_same_as_linear(
+            tested, make_name_list(['a', 'b']))
+        # a scans b and a, then b is found in the index
+        self.assertEqual(comparisons, 3)
+
+    def test_each_record_scanned_once(self):
+        tested = make_tested_list(f'name{i}' for i in range(100))
+        quarantined = make_name_list(f'name{i}' for i in range(99, -1, -1))
+        comparisons, linear_comparisons = self.check_same_as_linear(
+            tested, quarantined)
+        self.assertEqual(linear_comparisons, 5050)
+        self.assertLess(comparisons, 2 * 100)
+
+
+class AdaptiveFinderTests(BaseTester):
+
+    def check_strategy(self, tested, quarantined, expected_strategy):
+        expected, _ = hash_result_finder(tested, quarantined)
+        StatCounter.reset_counts()
+        results, comparisons, strategy = adaptive_result_finder(tested,
+                                                                quarantined)
+        self.assertEqual(strategy, expected_strategy)
+        self.AssertListsEqual(results, expected)
+        # checking the lists are sorted doesn't use counted comparisons
+        self.assertEqual(comparisons, actual_count(NAME_COMPS))
+
+    def test_all_finders_agree(self):
+        tested, quarantined = make_sample_lists(60, 30)
+        expected, _ = linear_result_finder(tested, quarantined)
+        for finder in FINDERS.values():
+            results, comparisons = finder(tested, quarantined)
+            self.AssertListsEqual(results, expected)
+
+    def test_tiny_unsorted_lists_use_linear(self):
+        tested = make_tested_list(['Lee', 'Dee'])
+        quarantined = make_name_list(['Dee'])
+        self.check_strategy(tested, quarantined, 'linear')
+
+    def test_few_queries_use_binary(self):
+        tested, quarantined = make_sample_lists(10000, 5)
+        self.check_strategy(tested, quarantined, 'binary')
+
+    def test_similar_sorted_lists_use_dual(self):
+        tested, quarantined = make_sample_lists(1000, 1000)
+        self.check_strategy(tested, quarantined, 'dual')
+
+    def test_unsorted_lists_use_hash(self):
+        tested, quarantined = make_sample_lists(
+            1000, 1000, sort_tested=False, sort_quarantined=False)
+        self.check_strategy(tested, quarantined, 'hash')
+
+    def test_check_cost_counted(self):
+        checked = estimate_costs(100000, 10, CHECK, None)
+        known = estimate_costs(100000, 10, 'strict', None)
+        self.assertGreater(checked['binary'], known['binary'])
+        self.assertEqual(checked['hash'], known['hash'])
+
+    def test_sample_finds_unsorted(self):
+        names = make_name_list(f'name{i:04}' for i in range(1000))
+        self.assertEqual(sample_sortedness(names), CHECK)
+        names[0], names[-1] = names[-1], names[0]
+        self.assertIsNone(sample_sortedness(names))
+
+    def test_sortedness_hints(self):
+        tested, quarantined = make_sample_lists(10000, 5)
+        _, _, strategy = adaptive_result_finder(
+            tested, quarantined, tested_sorted='strict',
+            quarantined_sorted='strict')
+        self.assertEqual(strategy, 'binary')
+        _, _, strategy = adaptive_result_finder(tested, quarantined,
+                                                tested_sorted=None)
+        self.assertNotIn(strategy, ('binary', 'dual'))
+
+    def test_sorted_sample_but_unsorted_list(self):
+        tested, quarantined = make_sample_lists(10000, 5)
+        # swap two neighbours the sample won't look at
+        tested[1], tested[2] = tested[2], tested[1]
+        # hashing 10000 fresh Names costs more than 5 scans of them
+        self.check_strategy(tested, quarantined, 'linear')
+
+    def test_unsorted_queries_on_sorted_tested_use_binary(self):
+        # computing every Name's hash is dearer than binary searches
+        tested, quarantined = make_sample_lists(2000, 2000,
+                                                sort_quarantined=False)
+        self.check_strategy(tested, quarantined, 'binary')
+
+
+class BenchmarkSuiteTests(BaseTester):
+
+    def test_measure_finder(self):
+        tested = make_tested_list(['a', 'b', 'c'])
+        quarantined = make_name_list(['b', 'd'])
+        result = measure_finder(hash_result_finder, tested, quarantined, 3)
+        self.assertEqual(result['runs'], 3)
+        self.assertLessEqual(result['median'], result['p95'])
+        self.assertEqual(result['comparisons'], result['counted_comparisons'])
+        self.assertEqual(result['hashes'], 5)
+        # every run starts without cached hashes, not just the first
+        self.assertEqual(result['hashes_computed'], 5)
+        self.assertEqual(result['memory_used'], 6 + 3)
+
+    def test_peak_memory_per_run(self):
+        big = make_tested_list(f'name{i}' for i in range(20000))
+        big_result = measure_finder(hash_result_finder, big,
+                                    make_name_list(['name1']), 1)
+        small_result = measure_finder(hash_result_finder,
+                                      make_tested_list(['a', 'b', 'c']),
+                                      make_name_list(['b']), 1)
+        # the small run's peak isn't the big run's high-water mark
+        self.assertLess(small_result['peak_traced_kb'],
+                        big_result['peak_traced_kb'])
+
+    def test_compare_results(self):
+        old = {'hash/big': {'median': 1.0, 'comparisons': 10, 'hashes': 5,
+                            'memory_used': 7},
+               'dual/big': {'median': 1.0, 'comparisons': 10, 'hashes': 0,
+                            'memory_used': 0}}
+        new = {'hash/big': {'median': 1.05, 'comparisons': 11, 'hashes': 5,
+                            'memory_used': 7},
+               'dual/big': {'median': 1.2, 'comparisons': 9, 'hashes': 0,
+                            'memory_used': 0},
+               'linear/big': {'median': 9.0, 'comparisons': 99, 'hashes': 0,
+                              'memory_used': 0}}
+        self.assertEqual(compare_results(old, new, threshold=0.1),
+                         [('dual/big', 'median', 1.0, 1.2),
+                          ('hash/big', 'comparisons', 10, 11)])
+        self.assertEqual(compare_results(old, old), [])
+
+    def test_compare_ignores_tiny_slowdowns(self):
+        old = {'hash/small': {'median': 0.001, 'comparisons': 10,
+                              'hashes': 5, 'memory_used': 7}}
+        new = {'hash/small': {'median': 0.003, 'comparisons': 10,
+                              'hashes': 5, 'memory_used': 7}}
+        # three times slower but only by 2 ms
+        self.assertEqual(compare_results(old, new), [])
+        self.assertEqual(compare_results(old, new, min_delta=0.001),
+                         [('hash/small', 'median', 0.001, 0.003)])
+
+
 def all_tests_suite():
     suite = unittest.TestSuite()
     # uncomment the following lines when you're
@@ -909,6 +2274,24 @@ def all_tests_suite():
     # the following test your HashTable class
     suite.addTest(unittest.makeSuite(TrivialHashTableTests))
     suite.addTest(unittest.makeSuite(HashTableTests))
+    suite.addTest(unittest.makeSuite(NameHashCacheTests))
+    suite.addTest(unittest.makeSuite(RecordMemoryTests))
+    suite.addTest(unittest.makeSuite(LongChainTests))
+    suite.addTest(unittest.makeSuite(NameInternTests))
+    suite.addTest(unittest.makeSuite(NameCountingTests))
+    suite.addTest(unittest.makeSuite(OpenAddressHashTableTests))
+    suite.addTest(unittest.makeSuite(ResizingHashTableTests))
+    suite.addTest(unittest.makeSuite(BulkBuildTests))
+    suite.addTest(unittest.makeSuite(GetManyTests))
+    suite.addTest(unittest.makeSuite(MappedHashTableTests))
+    suite.addTest(unittest.makeSuite(ShardedHashTests))
+    suite.addTest(unittest.makeSuite(ThreadedStatCounterTests))
+    suite.addTest(unittest.makeSuite(MeasureTests))
+    suite.addTest(unittest.makeSuite(ProfilerTests))
+    suite.addTest(unittest.makeSuite(HashFunctionTests))
+    suite.addTest(unittest.makeSuite(StreamingReaderTests))
+    suite.addTest(unittest.makeSuite(BinaryTestDataTests))
+    suite.addTest(unittest.makeSuite(GeneratedTestDataTests))
 
     # the following test your hash_result_finder function
     suite.addTest(unittest.makeSuite(TrivialHashTests))
@@ -923,6 +2306,7 @@ def all_tests_suite():
 
     # the following test your dual_result_finder function
     # suite.addTest(unittest.makeSuite(HelpfulDualTests))
+    suite.addTest(unittest.makeSuite(GallopingDualTests))
     # suite.addTest(unittest.makeSuite(TrivialDualTests))
     # suite.addTest(unittest.makeSuite(SmallDualTests))
     # suite.addTest(unittest.makeSuite(DualTestsExact))
@@ -931,6 +2315,20 @@ def all_tests_suite():
     # suite.addTest(unittest.makeSuite(HugeDualTests))
     # suite.addTest(unittest.makeSuite(GinormousDualTests))
 
+    # the following test the indexed linear search
+    suite.addTest(unittest.makeSuite(IndexedLinearTests))
+
+    # the following test the batched binary search
+    suite.addTest(unittest.makeSuite(BatchedBinaryTests))
+    suite.addTest(unittest.makeSuite(EytzingerIndexTests))
+    suite.addTest(unittest.makeSuite(VectorFinderTests))
+
+    # the following test the finder that picks which finder to use
+    suite.addTest(unittest.makeSuite(AdaptiveFinderTests))
+
+    # the following test the benchmark suite helpers
+    suite.addTest(unittest.makeSuite(BenchmarkSuiteTests))
+
 
     return suite
 
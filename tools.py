@@ -1,7 +1,28 @@
 """Module for reading test data."""
 from classes2 import Name
+from array import array
+import itertools
+import math
 import random
+import string
+import struct
+import sys
 
+# Layout of a binary test data file made by convert_test_data, all
+# little-endian. After the header (magic, tested size, quarantined size):
+#   tested: nhis (int64s), result bitmap, names block
+#   quarantined: names block
+#   expected: nhis (int64s, 0 when None), has-nhi bitmap,
+#             has-result bitmap, result bitmap, names block
+# Bitmaps have one bit per record, lowest bit first, padded to whole bytes.
+# A names block is the uint64 byte size of the names, then the names as
+# utf-8 with a newline after each one. Loading a block splits it on the
+# newlines.
+BINARY_DATA_MAGIC = b'TESTDAT2'
+BINARY_DATA_HEADER = struct.Struct('<8sQQ')
+# the 8 bits of each byte value as booleans, lowest bit first
+_BYTE_BITS = [tuple(bool(byte >> bit & 1) for bit in range(8))
+              for byte in range(256)]
 
 
 def make_name_list(iterable, sort_order=None):
@@ -51,14 +72,145 @@ def make_tested_list(iterable, sort_order=None, test_result=True):
     return results
 
 
-def read_test_data(filename):
+def generate_test_data(filename, tested_size, quarantined_size,
+                       intersect_size, name_lengths=(8, 12),
+                       first_letters=None, true_fraction=0.5, seed=0):
+    """ Writes a generated test data file that read_test_data can read.
+    The tested list has tested_size records, the quarantined list has
+    quarantined_size names and intersect_size of those are in the tested list.
+    Both lists are sorted by name (and so the tested nhis count up from 1),
+    so the file works with every result finder.
+    Each name is a capital first letter then lowercase letters. The first
+    letters are spread according to first_letters, a dict mapping letters to
+    weights (all capitals equally likely by default), and name lengths are
+    picked evenly from the name_lengths (shortest, longest) range. Names
+    are made long enough to be unique, so very large files can have longer
+    names than asked for. Each tested result is True with probability
+    true_fraction.
+    The file is written in three passes that replay the same random
+    choices, so only one name is in memory at a time.
+    """
+    if not 0 <= intersect_size <= min(tested_size, quarantined_size):
+        raise ValueError('intersect_size must be between 0 and the size '
+                         'of the smaller list')
+    options = (tested_size, quarantined_size, intersect_size, name_lengths,
+               first_letters, true_fraction, seed)
+    with open(filename, 'w') as test_data_file:
+        test_data_file.write('# Tested people: nhi,name,result\n')
+        test_data_file.write(f'{tested_size}\n')
+        test_data_file.writelines(
+            f'{nhi},{name},{result}\n'
+            for name, nhi, result, quarantined in _generate_people(*options)
+            if nhi is not None)
+
+        test_data_file.write('# Quarantined people\n')
+        test_data_file.write(f'{quarantined_size}\n')
+        test_data_file.writelines(
+            f'{name}\n'
+            for name, nhi, result, quarantined in _generate_people(*options)
+            if quarantined)
+
+        test_data_file.write('# Expected results: name,nhi,result\n')
+        test_data_file.writelines(
+            f'{name},{nhi},{result}\n'
+            for name, nhi, result, quarantined in _generate_people(*options)
+            if quarantined)
+
+
+def generated_filename(tested_size, quarantined_size, intersect_size,
+                       suffix='g'):
+    """ Returns a file name in the same style as the test_data files, eg,
+    test_data-1000n-100n-10-g.txt
+    """
+    return (f'test_data-{tested_size}n-{quarantined_size}n-'
+            f'{intersect_size}-{suffix}.txt')
+
+
+def _generate_people(tested_size, quarantined_size, intersect_size,
+                     name_lengths, first_letters, true_fraction, seed):
+    """ Yields a (name, nhi, result, quarantined) tuple for everyone in a
+    generated data file, in name order. nhi and result are None for people
+    who aren't in the tested list. The same arguments always give the same
+    people.
+    """
+    generator = random.Random(seed)
+    total_size = tested_size + quarantined_size - intersect_size
+    if first_letters is None:
+        first_letters = dict.fromkeys(string.ascii_uppercase, 1)
+    letters = sorted(first_letters)
+    total_weight = sum(first_letters.values())
+    # people 0 up to letter_ends[0] get the first letter, and so on
+    letter_ends = [round(total_size * weight / total_weight) for weight
+                   in itertools.accumulate(first_letters[letter]
+                                           for letter in letters)]
+    # each name holds its position in base 26 so the names are unique
+    # and in the same order as the positions
+    digits = max(1, math.ceil(math.log(max(total_size, 2), 26)))
+    shortest, longest = name_lengths
+
+    tested_left = tested_size
+    intersect_left = intersect_size
+    letter_index = 0
+    nhi = 0
+    for person in range(total_size):
+        while (letter_index < len(letters) - 1
+               and person >= letter_ends[letter_index]):
+            letter_index += 1
+        # selection sampling picks exactly tested_size of the people for
+        # the tested list, and exactly intersect_size of those are also
+        # quarantined, everyone else is only quarantined
+        is_tested = generator.random() * (total_size - person) < tested_left
+        if is_tested:
+            is_intersect = generator.random() * tested_left < intersect_left
+            tested_left -= 1
+            if is_intersect:
+                intersect_left -= 1
+        body = []
+        value = person
+        for _ in range(digits):
+            value, digit = divmod(value, 26)
+            body.append(string.ascii_lowercase[digit])
+        body.reverse()
+        length = max(generator.randint(shortest, longest), 1 + digits)
+        padding = generator.choices(string.ascii_lowercase,
+                                    k=length - 1 - digits)
+        name = letters[letter_index] + ''.join(body) + ''.join(padding)
+        if is_tested:
+            nhi += 1
+            result = generator.random() < true_fraction
+            yield name, nhi, result, is_intersect
+        else:
+            yield name, None, None, True
+
+
+def make_name_pool():
+    """ Returns a function that makes a Name from a str, and gives back the
+    same Name every time it is called with the same str. The Names are
+    kept in a plain dict that is freed along with the function, so a
+    file's Names are shared without staying in memory after the file's
+    lists are dropped (unlike Name.intern, and quicker).
+    """
+    pool = {}
+
+    def make_name(base):
+        name = pool.get(base)
+        if name is None:
+            name = pool[base] = Name(base)
+        return name
+    return make_name
+
+
+def read_test_data(filename, intern=False):
     """Reads a test data file and returns a triple containg the list of tested
     people, the list of quarantined people and the list of results
     for quarantined people.
     The list of tested contains (nhi, Name, result) tuples
     The quarantined list is a list of Names
     The quarantined_results list is a list of (Name, nhi, result) tuples
+    If intern is True then a name that appears many times in the file is
+    only stored once, see make_name_pool.
     """
+    make_name = make_name_pool() if intern else Name
     tested = []
     quarantined = []
     quarantined_results = []
@@ -70,7 +222,7 @@ def read_test_data(filename):
             current_line = _get_next_line(test_data_file)
             nhi, name_str, result_str = current_line.split(',')
             result = True if result_str == 'True' else False
-            record = (int(nhi), Name(name_str), result)
+            record = (int(nhi), make_name(name_str), result)
             tested.append(record)
 
         #Read quarantined names
@@ -78,7 +230,7 @@ def read_test_data(filename):
         quarantined_size = int(current_line)
         for _ in range(quarantined_size):
             current_line = _get_next_line(test_data_file)
-            quarantined.append(Name(current_line))
+            quarantined.append(make_name(current_line))
 
         #Read expected details of quarantined people
         for _ in range(quarantined_size):   # will have same number as quarantined
@@ -95,12 +247,216 @@ def read_test_data(filename):
                 result = False
             else:
                 result = None
-            record = (Name(name_str), nhi, result)
+            record = (make_name(name_str), nhi, result)
             quarantined_results.append(record)
 
     return tested, quarantined, quarantined_results
 
 
+def iter_test_data(filename, intern=False):
+    """Generator version of read_test_data that reads one line at a time.
+    It is a little slower than read_test_data, use it when the lists are
+    too big to hold in memory.
+    Yields a (size, records) pair for each section of the file in turn:
+    the tested (nhi, Name, result) tuples, the quarantined Names and then
+    the expected (Name, nhi, result) tuples. records is a generator for that
+    section, it doesn't have to be used up before moving on to the next
+    section but the next section can't be read until it has been.
+    For example:
+        sections = iter_test_data(filename)
+        tested_size, tested = next(sections)
+        table = HashTable.from_pairs(
+            ((name, (nhi, result)) for nhi, name, result in tested),
+            size=tested_size)
+        quarantined_size, quarantined = next(sections)
+        for name in quarantined:
+            ...
+    """
+    make_name = make_name_pool() if intern else Name
+    with open(filename) as test_data_file:
+        #Read details of tested people
+        tested_size = int(_get_next_line(test_data_file))
+        records = _iter_section(test_data_file, tested_size,
+                                _parse_tested_line, make_name)
+        yield tested_size, records
+        _skip_rest(records)
+
+        #Read quarantined names
+        quarantined_size = int(_get_next_line(test_data_file))
+        records = _iter_section(test_data_file, quarantined_size,
+                                _parse_quarantined_line, make_name)
+        yield quarantined_size, records
+        _skip_rest(records)
+
+        #Read expected details of quarantined people
+        # will have same number as quarantined
+        records = _iter_section(test_data_file, quarantined_size,
+                                _parse_result_line, make_name)
+        yield quarantined_size, records
+        _skip_rest(records)
+
+
+def _iter_section(test_data_file, size, parse_line, make_name):
+    """Yields the next size records from the file, parsed by parse_line"""
+    for _ in range(size):
+        yield parse_line(_get_next_line(test_data_file), make_name)
+
+
+def _skip_rest(records):
+    """Reads any records left in a section so the next section can be read"""
+    for _ in records:
+        pass
+
+
+def _parse_tested_line(current_line, make_name):
+    """Returns the (nhi, Name, result) tuple for a tested line"""
+    nhi, name_str, result_str = current_line.split(',')
+    result = True if result_str == 'True' else False
+    return (int(nhi), make_name(name_str), result)
+
+
+def _parse_quarantined_line(current_line, make_name):
+    """Returns the Name for a quarantined line"""
+    return make_name(current_line)
+
+
+def _parse_result_line(current_line, make_name):
+    """Returns the (Name, nhi, result) tuple for an expected result line"""
+    name_str, nhi_str, result_str = current_line.split(',')
+    if nhi_str == 'None':
+        nhi = None
+    else:
+        nhi = int(nhi_str)
+    if result_str == 'True':
+        result = True
+    elif result_str == 'False':
+        result = False
+    else:
+        result = None
+    return (make_name(name_str), nhi, result)
+
+
+def convert_test_data(text_filename, binary_filename):
+    """Converts a text test data file into the binary format read by
+    read_binary_test_data.
+    """
+    tested, quarantined, quarantined_results = read_test_data(text_filename)
+    with open(binary_filename, 'wb') as binary_file:
+        binary_file.write(BINARY_DATA_HEADER.pack(
+            BINARY_DATA_MAGIC, len(tested), len(quarantined)))
+        binary_file.write(_pack_ints(nhi for nhi, _, _ in tested))
+        binary_file.write(_pack_bits(result for _, _, result in tested))
+        binary_file.write(_pack_names(name for _, name, _ in tested))
+
+        binary_file.write(_pack_names(quarantined))
+
+        binary_file.write(_pack_ints(0 if nhi is None else nhi
+                                     for _, nhi, _ in quarantined_results))
+        binary_file.write(_pack_bits(nhi is not None
+                                     for _, nhi, _ in quarantined_results))
+        binary_file.write(_pack_bits(result is not None
+                                     for _, _, result in quarantined_results))
+        binary_file.write(_pack_bits(result is True
+                                     for _, _, result in quarantined_results))
+        binary_file.write(_pack_names(name for name, _, _ in quarantined_results))
+
+
+def read_binary_test_data(filename, intern=False):
+    """Reads a binary test data file made by convert_test_data and returns
+    the same triple as read_test_data.
+    The nhis and results are read as whole columns rather than parsed line
+    by line, and the names are decoded in one go and then sliced up.
+    """
+    make_name = make_name_pool() if intern else Name
+    with open(filename, 'rb') as binary_file:
+        data = memoryview(binary_file.read())
+    magic, tested_size, quarantined_size = BINARY_DATA_HEADER.unpack_from(data)
+    if magic != BINARY_DATA_MAGIC:
+        raise ValueError(f'{filename} is not a binary test data file')
+    offset = BINARY_DATA_HEADER.size
+
+    nhis, offset = _unpack_ints(data, offset, tested_size)
+    results, offset = _unpack_bits(data, offset, tested_size)
+    names, offset = _unpack_names(data, offset, tested_size, make_name)
+    tested = list(zip(nhis, names, results))
+
+    quarantined, offset = _unpack_names(data, offset, quarantined_size,
+                                        make_name)
+
+    nhis, offset = _unpack_ints(data, offset, quarantined_size)
+    has_nhis, offset = _unpack_bits(data, offset, quarantined_size)
+    has_results, offset = _unpack_bits(data, offset, quarantined_size)
+    results, offset = _unpack_bits(data, offset, quarantined_size)
+    names, offset = _unpack_names(data, offset, quarantined_size, make_name)
+    quarantined_results = [
+        (name, nhi if has_nhi else None, result if has_result else None)
+        for name, nhi, has_nhi, result, has_result
+        in zip(names, nhis, has_nhis, results, has_results)]
+    return tested, quarantined, quarantined_results
+
+
+def _pack_ints(ints):
+    """Returns the ints packed as little-endian int64s"""
+    column = array('q', ints)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+
+def _unpack_ints(data, offset, count):
+    """Returns a list of count int64s read from data at offset,
+    and the offset just after them.
+    """
+    end = offset + 8 * count
+    column = array('q')
+    column.frombytes(data[offset:end])
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tolist(), end
+
+
+def _pack_bits(bools):
+    """Returns the bools packed into a bitmap"""
+    bitmap = bytearray()
+    bools = iter(bools)
+    while True:
+        chunk = list(itertools.islice(bools, 8))
+        if not chunk:
+            return bytes(bitmap)
+        bitmap.append(sum(1 << bit for bit, value in enumerate(chunk) if value))
+
+
+def _unpack_bits(data, offset, count):
+    """Returns a list of count bools read from the bitmap in data at offset,
+    and the offset just after the bitmap.
+    """
+    end = offset + (count + 7) // 8
+    bits = itertools.chain.from_iterable(
+        _BYTE_BITS[byte] for byte in data[offset:end])
+    return list(itertools.islice(bits, count)), end
+
+
+def _pack_names(names):
+    """Returns a names block for the given Names"""
+    blob = ''.join(name._name + '\n' for name in names).encode('utf-8')
+    return struct.pack('<Q', len(blob)) + blob
+
+
+def _unpack_names(data, offset, count, make_name):
+    """Returns a list of count Names from the names block in data at offset,
+    and the offset just after the block.
+    """
+    blob_size, = struct.unpack_from('<Q', data, offset)
+    blob_start = offset + 8
+    blob = str(data[blob_start:blob_start + blob_size], 'utf-8')
+    strings = blob.split('\n')
+    # there is an empty string after the last newline
+    strings.pop()
+    if len(strings) != count:
+        raise ValueError(f'expected {count} names but found {len(strings)}')
+    return list(map(make_name, strings)), blob_start + blob_size
+
+
 def _get_next_line(test_data_file):
     """Reads and returns one line from a test data file. Returns None if the end
     of file is reached."""
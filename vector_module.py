@@ -0,0 +1,60 @@
+"""Module for finding test results with NumPy arrays of names.
+NumPy is optional, it is only needed if you use vector_result_finder.
+"""
+import math
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_MISSING_ERROR = 'vector_result_finder needs NumPy, eg, pip install numpy'
+
+
+def vector_result_finder(tested, quarantined, estimate_comparisons=True):
+    """ Does the same job as binary_result_finder and hash_result_finder for
+    bulk runs where throughput matters more than counting comparisons.
+    The strings inside the tested and quarantined Names are copied into
+    NumPy arrays, the tested array is sorted (tested doesn't have to be in
+    order) and every quarantined name is looked up at once with
+    np.searchsorted. No Name comparisons are made.
+    The results are in the same order as quarantined. If a name is in
+    tested more than once the first record for it is used.
+    The comparisons returned are an estimate of what binary_result_finder
+    would use, ie, one per halving plus one per name, or None if
+    estimate_comparisons is False.
+    """
+    if np is None:
+        raise ImportError(NUMPY_MISSING_ERROR)
+    if len(tested) == 0:
+        results = [(name, None, None) for name in quarantined]
+        return results, (0 if estimate_comparisons else None)
+
+    # object arrays of the strs themselves, fixed width str arrays would
+    # drop trailing NULs and make 'a\x00' match 'a'
+    tested_keys = np.array([record[1]._name for record in tested],
+                           dtype=object)
+    query_keys = np.array([name._name for name in quarantined], dtype=object)
+    # a stable sort keeps duplicate names in their tested order
+    order = np.argsort(tested_keys, kind='stable')
+    sorted_keys = tested_keys[order]
+    positions = np.searchsorted(sorted_keys, query_keys, side='left')
+    positions = np.minimum(positions, len(tested) - 1)
+    found = sorted_keys[positions] == query_keys
+    record_indexes = order[positions]
+
+    results = []
+    for name, record_index, is_found in zip(quarantined,
+                                            record_indexes.tolist(),
+                                            found.tolist()):
+        if is_found:
+            nhi, _, result = tested[record_index]
+            results.append((name, nhi, result))
+        else:
+            results.append((name, None, None))
+
+    comparisons = None
+    if estimate_comparisons:
+        halvings = math.ceil(math.log2(len(tested)))
+        comparisons = len(quarantined) * (halvings + 1)
+    return results, comparisons